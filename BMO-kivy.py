@@ -1,71 +1,152 @@
-import audioop
-import math
+import time
+
+BOOT_STARTED = time.perf_counter()
+
 import os
-import wave
+from collections import deque
+from concurrent.futures import Future
 
 os.environ['KIVY_AUDIO'] = 'sdl2'
 from kivy.animation import Animation
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.core.audio import SoundLoader
+from kivy.core.window import Window
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.image import Image
 from kivy.uix.video import Video
-import pvporcupine
 import random
-import speech_recognition as sr
 import threading
-import time
-from pvrecorder import PvRecorder
 
-from command_router import CommandRouter
-from fish_audio import FishAudioClient
+from audio_assets import AudioAssetPool
+from audio_envelope import load_envelope
+from audio_stream import StreamingPlayer
+from face_textures import FaceTextureCache
+from process_supervisor import GAME
+from sentences import SentenceAccumulator, split_sentences
+from turn_trace import tracer
+from turn_worker import Turn, TurnCancelled
+from video_cache import VideoTranscodeCache
+from viseme_timeline import VISEME_FPS, VisemeTimeline
+from voice_pipeline import PipelineHost, StartupTimer, VoicePipeline
 
 TALKING_VIDEO = './Videos/talking.mp4'
+SONG_FACE = './pictures/song-face.PNG'
 
 
 image_directory = "./faces"
 
 
-def _load_images_with_extensions(*extensions):
+class StreamedSentence:
+    """Clip queue entry for a sentence played through the streaming player instead of downloaded."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def _release_future(future, release):
+    if not future.cancelled() and future.exception() is None:
+        release(future.result())
+
+
+def _list_files(directory, *extensions):
     return sorted(
-        os.path.join(image_directory, f)
-        for f in os.listdir(image_directory)
+        os.path.join(directory, f)
+        for f in os.listdir(directory)
         if f.lower().endswith(extensions)
     )
 
 
+def _load_images_with_extensions(*extensions):
+    return _list_files(image_directory, *extensions)
+
+
 images = _load_images_with_extensions(".jpg", ".png")
 
 
-class BMOApp(App):
+class BMOApp(App, PipelineHost):
 
-    def __init__(self, **kwargs):
+    def __init__(self, startup=None, **kwargs):
         super().__init__(**kwargs)
         self.is_playing = False  # Flag to check if video or audio is currently playing
+        # Set on the turn worker as soon as a reply is claimed, before the UI thread sees is_playing.
+        self._reply_pending = threading.Event()
+        self._busy_lock = threading.Lock()
         self.max_video_duration = 0
-        self.command_enabled = False
-        self.awaiting_command = False
-        self.porcupine = None
-        self.wake_listener_thread = None
-        self.stop_listening_event = threading.Event()
         self.on_audio_complete = None
-        self.device_index = int(os.environ.get("PICOVOICE_DEVICE_INDEX", 0))
-        self.command_router = CommandRouter()
-        self.tts_client = FishAudioClient()
+        self.startup = startup or StartupTimer(BOOT_STARTED)
+        self.voice = VoicePipeline(self, self.startup)
+        self.echo_gate = self.voice.echo_gate
+        self.voice.music.listeners.append(
+            lambda event, *_: Clock.schedule_once(lambda *_: self._on_music(event), 0)
+        )
+        self.voice.processes.listeners.append(
+            lambda event, process: Clock.schedule_once(lambda *_: self._on_process(event, process), 0)
+        )
         self.idle_faces = images
         self.viseme_frames = self._load_viseme_frames()
         self.idle_face_source = random.choice(self.idle_faces) if self.idle_faces else None
         self._viseme_clock = None
-        self._viseme_points = []
-        self._smoothed_intensity = 0.0
+        self._viseme_timeline = None
+        self._viseme_live_envelope = None
+        self._current_viseme = None
+        self._pending_face = None
+        self._face_path = None
+        self.face_textures = FaceTextureCache()
+        self.audio_assets = AudioAssetPool()
+        self._fade_out = Animation(opacity=0.0, d=0.08)
+        self._fade_out.bind(on_complete=self._finish_face_fade)
+        self._fade_in = Animation(opacity=1.0, d=0.08)
         self._audio_start_time = None
         self._active_sound = None
+        self._active_stream = None
+        self._clip_queue = deque()
+        self._clip_queue_open = False
+        self._clip_poll = None
+        self._clips_played = 0
+        self._clip_failures = 0
+        self._current_clip_path = None
+        self._on_clip_done = None
+        self._preloaded_sounds = {}
+        self.stream_replies = os.environ.get("BMO_STREAM_REPLIES", "1") != "0"
+
+    @property
+    def command_router(self):
+        return self.voice.command_router
+
+    @property
+    def tts_client(self):
+        return self.voice.tts_client
+
+    @property
+    def stream_playback(self):
+        return (
+            os.environ.get("BMO_STREAM_PLAYBACK", "1") != "0"
+            and self.tts_client.audio_format == "wav"
+            and StreamingPlayer.available()
+        )
 
     def build(self):
+        self.startup.mark("imports and app init")
+        build_started = time.perf_counter()
+        self.face_textures.preload(self.viseme_frames + self.idle_faces)
+        print(f"Face textures: {self.face_textures.describe()}")
+        assets_started = time.perf_counter()
+        self.audio_assets.preload(self.audio_assets.short_clips())
+        self.startup.add("audio assets", time.perf_counter() - assets_started)
+        print(f"Audio assets: {self.audio_assets.describe()}")
         self.layout = BoxLayout()
-        self.image = Image(source=self.idle_face_source, allow_stretch=True)
+        self.image = Image(allow_stretch=True)
+        self._show_face(self.idle_face_source)
         self.layout.add_widget(self.image)
+        self.loop_video = Video(allow_stretch=True, options={'eos': 'loop'})
+        self.once_video = Video(allow_stretch=True)
+        self.once_video.bind(eos=self.on_video_end)
+        self._video_stop = None
+        self.video_cache = VideoTranscodeCache(Window.size)
+        videos = _list_files("./Videos", ".mp4", ".mkv", ".mov")
+        threading.Thread(target=self.video_cache.prepare, args=(videos,), daemon=True).start()
+        self.startup.add("face textures and layout", time.perf_counter() - build_started)
 
         self.power_up()
 
@@ -79,66 +160,54 @@ class BMOApp(App):
         if self.image not in self.layout.children or len(self.layout.children) != 1:
             self.layout.clear_widgets()
             self.layout.add_widget(self.image)
-        if not self.image.source and self.idle_faces:
-            self.image.source = random.choice(self.idle_faces)
+        if not self._face_path and self.idle_faces:
+            self._show_face(random.choice(self.idle_faces))
+
+    def _restore_face_canvas(self, face_path=None):
+        """Put the shared face widget back on screen showing ``face_path`` or an idle face."""
+        if self.image not in self.layout.children or len(self.layout.children) != 1:
+            self.layout.clear_widgets()
+            self.layout.add_widget(self.image)
+        self._show_face(face_path or self._choose_idle_face())
+
+    def _show_face(self, face_path):
+        """Swap the face widget's texture from the preloaded cache without decoding files."""
+        texture = self.face_textures.get(face_path)
+        if texture is None:
+            return
+        self._face_path = face_path
+        self.image.texture = texture
+        self.image.texture_size = list(texture.size)
 
     def _set_face_image(self, face_path):
         if not face_path:
             return
         if not self.image:
             return
-        if self.image.source == face_path and self.image.opacity >= 1:
+        if self._pending_face is not None:
+            self._pending_face = face_path  # a fade is already running; it will pick this up
+            return
+        if self._face_path == face_path and self.image.opacity >= 1:
             return
 
-        def _swap_source(*_):
-            self.image.source = face_path
-            Animation(opacity=1.0, d=0.08).start(self.image)
+        self._pending_face = face_path
+        self._fade_in.cancel(self.image)
+        self._fade_out.start(self.image)
 
-        Animation(opacity=0.0, d=0.08).bind(on_complete=_swap_source).start(self.image)
+    def _finish_face_fade(self, animation, widget):
+        face_path, self._pending_face = self._pending_face, None
+        if face_path:
+            self._show_face(face_path)
+        self._fade_in.start(widget)
 
     def _choose_idle_face(self):
         return random.choice(self.idle_faces) if self.idle_faces else None
 
     def _analyze_audio_envelope(self, audio_path, duration):
-        try:
-            with wave.open(audio_path, "rb") as wav_file:
-                frame_rate = wav_file.getframerate()
-                sample_width = wav_file.getsampwidth()
-                window_size = int(frame_rate * 0.08)
-                timestamps = []
-                values = []
-                current_frame = 0
-                data = wav_file.readframes(window_size)
-                while data:
-                    rms = audioop.rms(data, sample_width)
-                    timestamps.append(current_frame / frame_rate)
-                    values.append(rms)
-                    current_frame += window_size
-                    data = wav_file.readframes(window_size)
-
-                if not values:
-                    return []
-
-                peak = max(values) or 1
-                normalized = [(timestamps[i], values[i] / peak) for i in range(len(values))]
-                if duration and normalized[-1][0] < duration:
-                    normalized.append((duration, 0.0))
-                return normalized
-        except (wave.Error, FileNotFoundError, EOFError):
-            return []
-
-    def _interpolated_envelope(self, elapsed):
-        if not self._viseme_points:
-            return 0.5 + 0.5 * math.sin(elapsed * 8)
-
-        for idx, (timestamp, value) in enumerate(self._viseme_points):
-            if elapsed <= timestamp:
-                if idx == 0:
-                    return value
-                prev_t, prev_v = self._viseme_points[idx - 1]
-                progress = (elapsed - prev_t) / max(timestamp - prev_t, 1e-6)
-                return prev_v + (value - prev_v) * progress
-        return self._viseme_points[-1][1]
+        if self.audio_assets.owns(audio_path):
+            return self.audio_assets.envelope(audio_path, duration)
+        # Synthesized clips are short-lived, so they don't get a sidecar cache.
+        return load_envelope(audio_path, duration, persist=False)
 
     def _drive_visemes(self, duration):
         if not self.is_playing:
@@ -149,109 +218,348 @@ class BMOApp(App):
             self.on_audio_end()
             return False
 
-        target_intensity = self._interpolated_envelope(elapsed)
-        self._smoothed_intensity += (target_intensity - self._smoothed_intensity) * 0.35
-        frame_count = len(self.viseme_frames) or 1
-        frame_index = min(int(round(self._smoothed_intensity * (frame_count - 1))), frame_count - 1)
-        self._set_face_image(self.viseme_frames[frame_index])
+        if self._viseme_live_envelope is not None:
+            self._viseme_timeline.sync(self._viseme_live_envelope)
+        frame_index = self._viseme_timeline.frame_at(elapsed)
+        if frame_index is not None and frame_index != self._current_viseme:
+            self._current_viseme = frame_index
+            self._set_face_image(self.viseme_frames[frame_index])
         return True
 
-    def _start_viseme_loop(self, duration):
+    def _start_viseme_loop(self, duration, envelope, live=False):
+        """Compile ``envelope`` into a per-tick frame schedule and start animating.
+
+        With ``live`` the envelope is still growing (streamed audio) and the
+        schedule is extended on each tick as new points arrive.
+        """
         self._stop_viseme_loop()
+        frame_count = len(self.viseme_frames)
+        if envelope or live:
+            self._viseme_timeline = VisemeTimeline.compile(envelope, frame_count)
+        else:
+            self._viseme_timeline = VisemeTimeline.synthetic(duration, frame_count)
+        self._viseme_live_envelope = envelope if live else None
         self._audio_start_time = time.time()
+        self.echo_gate.start_playback(envelope, self._audio_start_time)
 
         def _tick(dt):
             if not self._drive_visemes(duration):
                 return False
 
-        self._viseme_clock = Clock.schedule_interval(_tick, 1 / 30.0)
+        self._viseme_clock = Clock.schedule_interval(_tick, 1 / VISEME_FPS)
 
     def _stop_viseme_loop(self):
         if self._viseme_clock:
             self._viseme_clock.cancel()
             self._viseme_clock = None
-        self._viseme_points = []
-        self._smoothed_intensity = 0.0
+        self._viseme_timeline = None
+        self._viseme_live_envelope = None
+        self._current_viseme = None
         self._audio_start_time = None
+        self.echo_gate.stop_playback()
 
     def power_up(self):
-        self.command_enabled = False
+        self.voice.command_enabled = False
         self.stop_wake_word_listener()
+        self.voice.warm_up()  # Porcupine, STT, Ollama and Fish Audio load while the startup clip plays
         self.play_power_up_sequence()
 
     def power_down(self):
-        self.command_enabled = False
+        self.voice.command_enabled = False
         self.stop_wake_word_listener()
+        self.cancel_turn()
         self.play_power_down_sequence()
 
     def change_face(self, *args):
-        self.image.source = self._choose_idle_face()
+        self._show_face(self._choose_idle_face())
 
     def play_video_for_duration(self, video_path, duration):
         """Play a video and loop it for the specified duration."""
-        self.layout.clear_widgets()
-        self.video_duration = duration
-        self.video_start_time = time.time()  # Store the starting time
-        
-        video = Video(source=video_path, allow_stretch=True)
-        video.bind(eos=self.loop_video)
-        self.layout.add_widget(video)
-        video.state = 'play'
-        
-    def loop_video(self, instance, state):
-        """Restart the video if it hasn't reached the specified duration."""
-        elapsed_time = time.time() - self.video_start_time
-        if elapsed_time < self.video_duration:
-            instance.seek(0)
-            instance.state = 'play'
+        self._show_video(self.loop_video, video_path)
+        if self._video_stop:
+            self._video_stop.cancel()
+        self._video_stop = Clock.schedule_once(self._end_looping_video, duration)
+
+    def _end_looping_video(self, *args):
+        self._video_stop = None
+        self.loop_video.state = 'pause'  # paused rather than stopped so the decoder stays loaded
+        self._restore_face_canvas()
+
+    def _show_video(self, video, video_path):
+        """Show one of the reusable video widgets, reloading only when the file changes."""
+        source = self.video_cache.get(video_path)
+        if video.source != source:
+            video.source = source
         else:
-            instance.state = 'stop'
+            video.seek(0)
+        if video not in self.layout.children or len(self.layout.children) != 1:
             self.layout.clear_widgets()
-            self.image = Image(source=self._choose_idle_face(), allow_stretch=True)
-            self.layout.add_widget(self.image)
+            self.layout.add_widget(video)
+        video.state = 'play'
 
     def check_video_position(self, instance, value):
         """Stop the video if it exceeds the specified duration."""
         if value >= self.max_video_duration:
             instance.state = 'stop'
-            self.layout.clear_widgets()
-            self.image = Image(source=self._choose_idle_face(), allow_stretch=True)
-            self.layout.add_widget(self.image)
+            self._restore_face_canvas()
 
     def talk_audio(self, audio_path, on_complete=None):
         """Play an audio clip and animate viseme PNGs in sync with the waveform."""
+        self.talk_audio_queue([audio_path], on_complete=on_complete)
+
+    def talk_audio_queue(self, clips, on_complete=None, on_clip_done=None, keep_open=False):
+        """Play clips back to back, animating visemes for each one.
+
+        ``clips`` holds paths or futures resolving to paths (e.g. sentences
+        still being synthesized). Playback waits for each future in order and
+        preloads the following clip so sentences run together without gaps.
+        ``on_clip_done`` is called with each path once it has been played.
+        With ``keep_open`` more clips can be added with ``_enqueue_clip`` until
+        ``_close_clip_queue`` is called.
+        """
         self.is_playing = True
         self.on_audio_complete = on_complete
+        self._on_clip_done = on_clip_done
+        self._clip_queue = deque(clips)
+        self._clip_queue_open = keep_open
+        self._clips_played = 0
+        self._clip_failures = 0
         self._prepare_face_canvas()
-        self._active_sound = SoundLoader.load(audio_path)
-        if self._active_sound:
-            duration = self._active_sound.length or 0
-            self._viseme_points = self._analyze_audio_envelope(audio_path, duration)
-            self._start_viseme_loop(duration)
-            self._active_sound.play()
-            self._active_sound.bind(on_stop=self.on_audio_end)
+        self._play_next_clip()
+
+    def _play_next_clip(self, *args):
+        self._clip_poll = None
+        if not self._clip_queue:
+            if self._clip_queue_open:
+                self._clip_poll = Clock.schedule_once(self._play_next_clip, 0.02)
+                return
+            self._finish_audio_queue()
+            return
+
+        head = self._clip_queue[0]
+        if isinstance(head, StreamedSentence):
+            self._clip_queue.popleft()
+            self._clips_played += 1
+            self._play_stream(head.text, fallback=lambda: self._download_instead(head.text))
+            return
+        if isinstance(head, Future):
+            if not head.done():
+                self._clip_poll = Clock.schedule_once(self._play_next_clip, 0.02)
+                return
+            self._clip_queue.popleft()
+            try:
+                audio_path = head.result()
+            except Exception as exc:  # pragma: no cover - runtime guard
+                print(f"Fish Audio request failed: {exc}")
+                self._clip_failures += 1
+                self._play_next_clip()
+                return
         else:
+            audio_path = self._clip_queue.popleft()
+
+        sound = self._preloaded_sounds.pop(audio_path, None)
+        if sound is None:
+            sound = self._load_sound(audio_path, preloaded=False)
+        if not sound:
+            self._release_clip(audio_path)
+            self._play_next_clip()
+            return
+
+        self._clips_played += 1
+        self._current_clip_path = audio_path
+        self._active_sound = sound
+        duration = sound.length or 0
+        self._start_viseme_loop(duration, self._analyze_audio_envelope(audio_path, duration))
+        sound.bind(on_stop=self.on_audio_end)
+        sound.play()
+        tracer.mark("playback_start")
+        self._preload_next_clip()
+
+    def _preload_next_clip(self):
+        if not self._clip_queue:
+            return
+        head = self._clip_queue[0]
+        if isinstance(head, StreamedSentence):
+            return
+        if isinstance(head, Future):
+            head.add_done_callback(lambda future: Clock.schedule_once(lambda *_: self._preload_future(future), 0))
+        else:
+            self._preload_clip(head)
+
+    def _preload_future(self, future):
+        if not self._clip_queue or self._clip_queue[0] is not future or future.exception() is not None:
+            return
+        self._preload_clip(future.result())
+
+    def _preload_clip(self, audio_path):
+        if self.audio_assets.owns(audio_path):
+            self.audio_assets.get(audio_path)  # pooled; nothing to unload on cancel
+        elif audio_path not in self._preloaded_sounds:
+            sound = self._load_sound(audio_path, preloaded=True)
+            if sound:
+                self._preloaded_sounds[audio_path] = sound
+
+    def _load_sound(self, audio_path, preloaded):
+        """Return a playable ``Sound``, reusing the pooled one for prerecorded clips."""
+        if self.audio_assets.owns(audio_path):
+            with tracer.span("sound_load", preloaded=preloaded, pooled=True):
+                asset = self.audio_assets.get(audio_path)
+            return asset.sound if asset else None
+        with tracer.span("sound_load", preloaded=preloaded):
+            return SoundLoader.load(audio_path)
+
+    def _enqueue_clip(self, clip):
+        self._clip_queue.append(clip)
+        if len(self._clip_queue) == 1 and (self._active_sound is not None or self._active_stream is not None):
+            self._preload_next_clip()
+
+    def _close_clip_queue(self):
+        self._clip_queue_open = False
+
+    def _release_clip(self, audio_path):
+        if audio_path and self._on_clip_done:
+            self._on_clip_done(audio_path)
+
+    def _cancel_audio_queue(self):
+        if self._clip_poll:
+            self._clip_poll.cancel()
+            self._clip_poll = None
+        release = self._on_clip_done
+        for pending in self._clip_queue:
+            if isinstance(pending, Future):
+                pending.cancel()
+                if release:  # clips synthesized but never played still have to be released
+                    pending.add_done_callback(lambda future: _release_future(future, release))
+            elif isinstance(pending, str) and release:
+                release(pending)
+        self._clip_queue.clear()
+        self._clip_queue_open = False
+        for sound in self._preloaded_sounds.values():
+            sound.unload()
+        self._preloaded_sounds.clear()
+
+    def _finish_audio_queue(self):
+        if self._clips_played == 0 and self._clip_failures:
+            self._handle_tts_failure(f"{self._clip_failures} clip(s) failed to synthesize.")
+            return
+        if self._clips_played == 0:
             self.is_playing = False
+            self.on_audio_complete = None
+            tracer.finish("done")
             self._resume_command_handling()
+            return
+        self._finish_audio()
+
+    def talk_stream(self, text, on_complete=None):
+        """Speak synthesized text as it downloads, animating from the streamed samples."""
+        self.is_playing = True
+        self.on_audio_complete = on_complete
+        self._prepare_face_canvas()
+        self._play_stream(text, fallback=lambda: self._speak_downloaded(text))
+
+    def _play_stream(self, text, fallback):
+        """Stream ``text`` and continue with ``on_audio_end``; call ``fallback`` if nothing played."""
+
+        def _on_start():
+            Clock.schedule_once(_begin_visemes, 0)
+
+        def _begin_visemes(*_):
+            if self._active_stream is not player:
+                return
+            tracer.mark("playback_start", stream=True)
+            self._start_viseme_loop(0, player.envelope, live=True)
+
+        def _on_finish(error):
+            Clock.schedule_once(lambda *_: _finish(error), 0)
+
+        def _finish(error):
+            if self._active_stream is not player:
+                return
+            self._active_stream = None
+            if error is not None and not player.envelope:
+                print(f"Streaming playback failed, falling back to a full download: {error}")
+                self._stop_viseme_loop()
+                fallback()
+                return
+            self.on_audio_end()
+
+        player = StreamingPlayer(self.tts_client.synthesize_stream(text), on_start=_on_start, on_finish=_on_finish)
+        self._active_stream = player
+        player.start()
+
+    def _download_instead(self, text):
+        self._clip_queue.appendleft(self.tts_client.submit(text))
+        self._play_next_clip()
 
     def play_static_audio_with_image(self, audio_path, image_path):
         """Play an audio and display a specified image until the audio finishes."""
         self.is_playing = True
         self.show_image_while_song_plays(image_path)
-        self._active_sound = SoundLoader.load(audio_path)
+        self._active_sound = self._load_sound(audio_path, preloaded=False)
         if self._active_sound:
             self._active_sound.play()
             self._active_sound.bind(on_stop=self.on_audio_end)
+            self._track_song_output(audio_path, self._active_sound)
+
+    def _track_song_output(self, audio_path, sound):
+        """Feed the song's loudness to the echo gate so BMO can be interrupted mid-song."""
+        started = time.time()
+        self.echo_gate.start_playback([], started)
+
+        def _load():
+            envelope = self._analyze_audio_envelope(audio_path, sound.length or None)
+            if self._active_sound is sound:
+                self.echo_gate.start_playback(envelope, started)
+
+        threading.Thread(target=_load, daemon=True).start()
+
+    def _on_music(self, event):
+        """Show the song face while the playlist plays, unless BMO is busy talking."""
+        if self.is_playing:
+            return
+        if event in ("start", "resume"):
+            self._restore_face_canvas(SONG_FACE)
+        elif event == "finish":
+            self._restore_face_canvas()
+
+    def _on_process(self, event, process):
+        """Stop video decoding while a game is running."""
+        if event != "start" or process.kind != GAME or not self.voice.pause_for_games:
+            return
+        if self._video_stop:
+            self._video_stop.cancel()
+            self._video_stop = None
+        for video in (self.loop_video, self.once_video):
+            if video.state == 'play':
+                video.state = 'pause'
+        if not self.is_playing:
+            self._restore_face_canvas()
 
     def show_image_while_song_plays(self, image_path):
-        self.layout.clear_widgets()
-        song_image = Image(source=image_path, allow_stretch=True)
-        self.layout.add_widget(song_image)
+        self._restore_face_canvas(image_path)
 
     def on_audio_end(self, *args):
+        if args and args[0] is not self._active_sound:
+            return  # late on_stop from a clip that was already replaced
         self._stop_viseme_loop()
+        finished = self._active_sound
         self._active_sound = None
+        if finished is not None:
+            finished.unbind(on_stop=self.on_audio_end)
+            if finished.state == 'play':
+                finished.stop()
+        if self._current_clip_path:
+            self._release_clip(self._current_clip_path)
+            self._current_clip_path = None
+        if self._clip_queue or self._clip_queue_open:
+            self._play_next_clip()
+            return
+        self._finish_audio()
+
+    def _finish_audio(self):
+        self._on_clip_done = None
         self.is_playing = False
+        tracer.finish("done")
         self.end_song_display()
         self._set_face_image(self._choose_idle_face())
         callback = self.on_audio_complete
@@ -262,89 +570,199 @@ class BMOApp(App):
             self._resume_command_handling()
 
     def end_song_display(self, *args):
-        self.layout.clear_widgets()
-        self.image = Image(source=self._choose_idle_face(), allow_stretch=True)
-        self.layout.add_widget(self.image)
+        self._restore_face_canvas()
 
-    def listen_for_command(self, *args):
-        if self.is_playing or not self.command_enabled:  # If a video or audio is currently playing, don't listen for commands
-            return
+    def is_busy(self):
+        return self.is_playing or self._reply_pending.is_set()
 
-        self.awaiting_command = True
-        r = sr.Recognizer()
-        with sr.Microphone() as source:
-            audio = r.listen(source)
+    def handle_command(self, text, turn):
+        self.process_command(text, turn)
 
-        try:
-            speech_text = r.recognize_google(audio)
-            self.process_command(speech_text)
-        except sr.UnknownValueError:
-            self.talk_audio("./responses/unknown-value-error.wav")  # Placeholder for error audio
-        except sr.RequestError:
-            self.talk_audio("./responses/fatal-error.wav")  # Placeholder for error audio
-        finally:
-            self.awaiting_command = False
+    def handle_unrecognized(self, turn, fatal):
+        clip = "./responses/fatal-error.wav" if fatal else "./responses/unknown-value-error.wav"
+        self._on_ui(turn, self.talk_audio, clip)  # Placeholder for error audio
 
-    def process_command(self, command):
-        if self.is_playing:
-            return
+    def interrupt(self):
+        self.cancel_turn()
 
-        self.is_playing = True
+    def call_soon(self, callback, *args):
+        Clock.schedule_once(lambda *_: callback(*args), 0)
+
+    def process_command(self, command, turn=None):
+        """Route ``command`` and hand the reply to the UI thread for playback.
+
+        Runs on the turn worker thread; only playback and face updates are
+        scheduled back onto the Kivy clock.
+        """
+        with self._busy_lock:
+            if self.is_busy():
+                return
+            self._reply_pending.set()
+
+        turn = turn or Turn(0)
+        self.call_soon(self._mark_busy, turn)
+        if self.stream_replies:
+            self._stream_reply(command, turn)
+            return
         try:
-            routed_response = self.command_router.route_command(command)
+            with tracer.span("route"):
+                routed_response = self.command_router.route_command(command)
+            turn.check()
+            self._log_routing_metrics()
             reply_text = routed_response.content
-            if reply_text:
+            if routed_response.audio_path:
+                print(f"BMO: <{os.path.basename(routed_response.audio_path)}>")
+                self._on_ui(turn, self.talk_audio, routed_response.audio_path, self._resume_command_handling)
+            elif reply_text:
                 print(f"BMO: {reply_text}")
-                self._speak_response(reply_text)
+                self._on_ui(turn, self._speak_response, reply_text)
             else:
-                self._handle_tts_failure("Empty response from router.")
+                self._on_ui(turn, self._handle_tts_failure, "Empty response from router.")
+        except TurnCancelled:
+            raise
         except Exception as exc:  # pragma: no cover - runtime guard
             print(f"Error while processing command: {exc}")
-            self._handle_tts_failure(str(exc))
+            self._on_ui(turn, self._handle_tts_failure, str(exc))
+
+    def _mark_busy(self, turn):
+        if not turn.cancelled:
+            self.is_playing = True
+        self._reply_pending.clear()
+
+    def _on_ui(self, turn, callback, *args):
+        """Run ``callback`` on the Kivy thread unless ``turn`` is stale by then."""
+        def _call(*_):
+            if not turn.cancelled:
+                callback(*args)
+
+        Clock.schedule_once(_call, 0)
+
+    def cancel_turn(self):
+        """Abandon the active turn: stop playback and drop speech still pending."""
+        self.voice.cancel_current_turn()
+        self._reply_pending.clear()
+        self._cancel_audio_queue()
+        if self._active_stream is not None:
+            self._active_stream.stop()
+            self._active_stream = None
+        sound = self._active_sound
+        self._active_sound = None
+        if sound is not None:
+            sound.unbind(on_stop=self.on_audio_end)
+            sound.stop()
+        if self._current_clip_path:
+            self._release_clip(self._current_clip_path)
+            self._current_clip_path = None
+        self._stop_viseme_loop()
+        self.on_audio_complete = None
+        self._on_clip_done = None
+        self.is_playing = False
+        tracer.finish("cancelled")
+
+    def _log_routing_metrics(self):
+        metrics = self.command_router.routing_metrics()
+        print(
+            f"Routing ({self.command_router.routing_mode}): {metrics['llm_calls']} LLM calls over "
+            f"{metrics['turns']} turns, {metrics['round_trips_saved']} round trips saved, "
+            f"{metrics['single_pass_fallbacks']} fallbacks, {metrics['fast_path_hits']} answered locally"
+        )
+        for model, stats in self.command_router.model_metrics().items():
+            print(
+                f"Model {model}: {stats['calls']} calls, {stats['mean_ms']:.0f}ms mean, "
+                f"{stats['mean_first_token_ms']:.0f}ms to first token, {stats['tokens_per_second']:.1f} tokens/s, "
+                f"{stats['last_prompt_tokens']} prompt tokens evaluated last call "
+                f"({stats['mean_prompt_tokens']:.0f} mean, {self.command_router.memory.tokens} history tokens)"
+            )
+        if self.voice.processes.running():
+            print(f"Child processes: {self.voice.processes.describe()}")
+
+    def _stream_reply(self, command, turn):
+        """Route ``command`` with a streamed reply and speak each sentence as it completes.
+
+        Sentences are synthesized in parallel as separate downloads. With WAV
+        output the first one is played through the streaming player instead,
+        so speech starts before its clip has finished downloading.
+        """
+        self._on_ui(
+            turn,
+            self.talk_audio_queue,
+            [],
+            self._resume_command_handling,
+            self.tts_client.release_path,
+            True,
+        )
+        accumulator = SentenceAccumulator()
+        spoken = []
+
+        def _speak(sentences):
+            for sentence in sentences:
+                turn.check()
+                if not spoken and self.stream_playback:
+                    clip = StreamedSentence(sentence)
+                else:
+                    clip = self.tts_client.submit(sentence)
+                spoken.append(sentence)
+                self._on_ui(turn, self._enqueue_clip, clip)
 
-    def _speak_response(self, reply_text: str):
         try:
-            audio_path = self.tts_client.synthesize_to_path(reply_text)
+            with tracer.span("route", streamed=True):
+                routed = self.command_router.route_command(
+                    command, on_text=lambda delta: _speak(accumulator.feed(delta))
+                )
+            _speak(accumulator.flush())
+            if routed.audio_path:
+                print(f"BMO: <{os.path.basename(routed.audio_path)}>")
+                self._on_ui(turn, self._enqueue_clip, routed.audio_path)
+        except TurnCancelled:
+            raise
         except Exception as exc:  # pragma: no cover - runtime guard
-            print(f"Fish Audio request failed: {exc}")
-            self._handle_tts_failure(str(exc))
-            return
-
-        self.talk_audio(audio_path, on_complete=self._cleanup_temp_audio(audio_path))
-
-    def _cleanup_temp_audio(self, audio_path: str):
-        def _cleanup():
-            try:
-                if audio_path and os.path.exists(audio_path):
-                    os.remove(audio_path)
-            finally:
-                self._resume_command_handling()
+            print(f"Error while processing command: {exc}")
+            if not spoken:
+                # Nothing queued yet; play the error clip in the open queue rather than end in silence.
+                self._on_ui(turn, self._enqueue_clip, "./responses/fatal-error.wav")
+        finally:
+            if spoken:
+                print(f"BMO: {' '.join(spoken)}")
+            self._log_routing_metrics()
+            self._on_ui(turn, self._close_clip_queue)
 
-        return _cleanup
+    def _speak_response(self, reply_text: str):
+        stats = self.tts_client.cache_stats()
+        if stats:
+            print(f"TTS cache: {stats['hits']} hits, {stats['misses']} misses, {stats['coalesced']} coalesced")
+        if self.stream_playback and len(split_sentences(reply_text)) == 1:
+            self.talk_stream(reply_text, on_complete=self._resume_command_handling)
+            return
+        self._speak_downloaded(reply_text)
+
+    def _speak_downloaded(self, reply_text: str):
+        futures = self.tts_client.synthesize_sentences(reply_text)
+        self.talk_audio_queue(
+            futures,
+            on_complete=self._resume_command_handling,
+            on_clip_done=self.tts_client.release_path,
+        )
 
     def _resume_command_handling(self):
-        if self.command_enabled:
-            self.awaiting_command = False
+        if self.voice.command_enabled:
+            self.voice.awaiting_command = False
             self.start_wake_word_listener()
 
     def _handle_tts_failure(self, reason: str):
         print(f"TTS failure: {reason}")
+        tracer.finish("tts_failed")
         self.talk_audio("./responses/fatal-error.wav")
 
     def play_video(self, video_path):
-        self.layout.clear_widgets()
-        video = Video(source=video_path, allow_stretch=True)
-        video.bind(eos=self.on_video_end)
-        self.layout.add_widget(video)
-        video.state = 'play'
+        self._show_video(self.once_video, video_path)
 
     def on_video_end(self, *args):
+        if len(args) > 1 and not args[1]:
+            return  # eos reset when the reused widget starts again
         self.is_playing = False
-        self.layout.clear_widgets()
-        self.image = Image(source=random.choice(images), allow_stretch=True)
-        self.layout.add_widget(self.image)
-        if self.command_enabled:
-            self.awaiting_command = False
+        self._restore_face_canvas()
+        if self.voice.command_enabled:
+            self.voice.awaiting_command = False
             self.start_wake_word_listener()
 
     def play_power_up_sequence(self):
@@ -356,54 +774,19 @@ class BMOApp(App):
         self.talk_audio(shutdown_audio_path, on_complete=self.stop)
 
     def enable_command_handling(self):
-        self.command_enabled = True
+        self.voice.command_enabled = True
         self.start_wake_word_listener()
 
-    def initialize_wake_word(self):
-        if self.porcupine:
-            return
-        access_key = os.environ.get("PICOVOICE_ACCESS_KEY")
-        keyword_path = os.environ.get("PICOVOICE_KEYWORD_PATH")
-        keywords = None if keyword_path else ["bumblebee"]
-        self.porcupine = pvporcupine.create(
-            access_key=access_key,
-            keyword_paths=[keyword_path] if keyword_path else None,
-            keywords=keywords,
-        )
-
     def start_wake_word_listener(self):
-        if not self.command_enabled or self.is_playing:
-            return
-
-        self.initialize_wake_word()
-        if self.wake_listener_thread and self.wake_listener_thread.is_alive():
-            return
-
-        self.stop_listening_event.clear()
-        self.wake_listener_thread = threading.Thread(target=self._wake_word_loop, daemon=True)
-        self.wake_listener_thread.start()
+        self.voice.start_listening()
 
     def stop_wake_word_listener(self):
-        self.stop_listening_event.set()
-        if self.wake_listener_thread and self.wake_listener_thread.is_alive():
-            self.wake_listener_thread.join()
-        self.wake_listener_thread = None
-
-    def _wake_word_loop(self):
-        recorder = PvRecorder(device_index=self.device_index, frame_length=self.porcupine.frame_length)
-        recorder.start()
-        try:
-            while not self.stop_listening_event.is_set():
-                pcm = recorder.read()
-                if self.porcupine.process(pcm) >= 0 and not self.awaiting_command and not self.is_playing:
-                    self.awaiting_command = True
-                    Clock.schedule_once(self.listen_for_command, 0)
-        finally:
-            recorder.stop()
-            recorder.delete()
+        self.voice.stop_listening()
 
     def on_stop(self):
-        self.stop_wake_word_listener()
+        self.cancel_turn()
+        self.voice.shutdown()
 
 
-BMOApp().run()
+if __name__ == "__main__":
+    BMOApp().run()
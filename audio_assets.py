@@ -0,0 +1,172 @@
+"""In-memory pool of loaded ``Sound`` objects for BMO's prerecorded audio."""
+
+import glob
+import os
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from kivy.core.audio import SoundLoader
+
+from audio_envelope import Envelope, load_envelope
+
+ASSET_DIRECTORIES = ("./responses", "./memes", "./songs")
+_AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg")
+# SDL2 decodes a whole clip into memory as 16-bit stereo at 44.1 kHz.
+_DECODED_BYTES_PER_SECOND = 44100 * 2 * 2
+
+
+class AudioAsset:
+    """A loaded clip and, once analyzed, its loudness envelope."""
+
+    def __init__(self, path: str, sound, size: int) -> None:
+        self.path = path
+        self.sound = sound
+        self.size = size
+        self.envelope: Optional[Envelope] = None
+
+
+class AudioAssetPool:
+    """Load each prerecorded clip once and hand out the same ``Sound`` on every play.
+
+    Clips passed to :meth:`preload` stay resident for the life of the app and
+    have their envelopes analyzed in the background. Anything else under the
+    asset directories (songs, large memes) is loaded on first use and kept in
+    an LRU that is trimmed whenever the decoded audio would exceed
+    ``max_bytes``; a clip that is still playing is never evicted.
+
+    Kivy sounds may only be created on the UI thread, so :meth:`preload` and
+    :meth:`get` belong there. :meth:`envelope` is also called from
+    background threads and never loads a sound, only reads the file.
+    """
+
+    def __init__(self, directories: Iterable[str] = ASSET_DIRECTORIES, max_bytes: Optional[int] = None) -> None:
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.environ.get("BMO_AUDIO_CACHE_MB", 96)) * 1024 * 1024
+        )
+        self.preload_max_bytes = int(float(os.environ.get("BMO_AUDIO_PRELOAD_MAX_MB", 8)) * 1024 * 1024)
+        self._pinned = {}
+        self._recent: "OrderedDict[str, AudioAsset]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pinned_bytes = 0
+        self.recent_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def owns(self, path: Optional[str]) -> bool:
+        """Whether ``path`` is a prerecorded asset rather than e.g. a synthesized clip."""
+
+        if not path:
+            return False
+        directory = os.path.dirname(os.path.abspath(path))
+        return any(directory == root or directory.startswith(root + os.sep) for root in self.directories)
+
+    def short_clips(self) -> List[str]:
+        """Clips in the asset directories small enough to keep loaded permanently (songs excluded)."""
+
+        paths = []
+        for directory in self.directories:
+            if os.path.basename(directory) == "songs":
+                continue
+            for path in sorted(glob.glob(os.path.join(directory, "*"))):
+                if path.lower().endswith(_AUDIO_EXTENSIONS) and os.path.getsize(path) <= self.preload_max_bytes:
+                    paths.append(path)
+        return paths
+
+    def preload(self, paths: Iterable[str]) -> None:
+        """Load ``paths`` now and analyze their envelopes on a background thread."""
+
+        loaded = []
+        for path in paths:
+            key = os.path.abspath(path)
+            with self._lock:
+                if key in self._pinned:
+                    continue
+            asset = self._load(path)
+            if asset is None:
+                continue
+            with self._lock:
+                self._pinned[key] = asset
+                self.pinned_bytes += asset.size
+            loaded.append(asset)
+        if loaded:
+            threading.Thread(target=self._analyze, args=(loaded,), daemon=True).start()
+
+    def get(self, path: str) -> Optional[AudioAsset]:
+        """Return the loaded asset for ``path``, loading and caching it if needed (UI thread only)."""
+
+        key = os.path.abspath(path)
+        with self._lock:
+            asset = self._pinned.get(key)
+            if asset is None:
+                asset = self._recent.get(key)
+                if asset is not None:
+                    self._recent.move_to_end(key)
+            if asset is not None:
+                self.hits += 1
+                return asset
+            self.misses += 1
+
+        asset = self._load(path)
+        if asset is None:
+            return None
+        with self._lock:
+            self._recent[key] = asset
+            self.recent_bytes += asset.size
+            self._trim()
+        return asset
+
+    def envelope(self, path: str, duration: Optional[float] = None) -> Envelope:
+        """The envelope for an asset, analyzed once and then reused while the asset stays loaded."""
+
+        key = os.path.abspath(path)
+        with self._lock:
+            asset = self._pinned.get(key) or self._recent.get(key)
+            if asset is not None and asset.envelope is not None:
+                return asset.envelope
+        if asset is None:
+            return load_envelope(path, duration)
+        envelope = load_envelope(path, duration or asset.sound.length or None)
+        with self._lock:
+            if asset.envelope is None:
+                asset.envelope = envelope
+            return asset.envelope
+
+    def describe(self) -> str:
+        with self._lock:
+            return (
+                f"{len(self._pinned)} clips preloaded ({self.pinned_bytes / 1048576:.1f} MB), "
+                f"{len(self._recent)} other clips cached ({self.recent_bytes / 1048576:.1f} MB), "
+                f"limit {self.max_bytes / 1048576:.0f} MB, {self.hits} hits, {self.misses} misses"
+            )
+
+    def _trim(self) -> None:
+        for key in list(self._recent):
+            if self.pinned_bytes + self.recent_bytes <= self.max_bytes or len(self._recent) <= 1:
+                break
+            asset = self._recent[key]
+            if asset.sound.state == "play":
+                continue
+            del self._recent[key]
+            self.recent_bytes -= asset.size
+            asset.sound.unload()
+
+    @staticmethod
+    def _load(path: str) -> Optional[AudioAsset]:
+        sound = SoundLoader.load(path)
+        if not sound:
+            print(f"Could not load audio {path}")
+            return None
+        size = int(sound.length * _DECODED_BYTES_PER_SECOND) if sound.length else os.path.getsize(path)
+        return AudioAsset(path, sound, size)
+
+    def _analyze(self, assets: List[AudioAsset]) -> None:
+        for asset in assets:
+            with self._lock:
+                if asset.envelope is not None:
+                    continue
+            envelope = load_envelope(asset.path, asset.sound.length or None)
+            with self._lock:
+                if asset.envelope is None:
+                    asset.envelope = envelope
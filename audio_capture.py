@@ -0,0 +1,157 @@
+"""Always-on microphone capture shared by wake-word detection and recognition."""
+
+import os
+import queue
+import threading
+from collections import deque
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from endpointing import END, NO_SPEECH, Endpointer
+
+SAMPLE_RATE = 16000
+
+FrameHandler = Callable[[Sequence[int]], None]
+
+
+class CaptureService:
+    """Single ``PvRecorder`` stream feeding every consumer of microphone audio.
+
+    Each frame goes to the registered handler (the wake-word detector) and
+    into a short pre-roll ring buffer. When :meth:`begin_utterance` is called,
+    usually from the handler as soon as the wake word fires, the pre-roll
+    plus every following frame is queued for :meth:`record_utterance`. The
+    device is never reopened and the first syllables of the command are kept.
+    """
+
+    def __init__(
+        self,
+        device_index: int,
+        frame_length: int,
+        sample_rate: int = SAMPLE_RATE,
+        preroll_ms: Optional[int] = None,
+    ) -> None:
+        self.device_index = device_index
+        self.frame_length = frame_length
+        self.sample_rate = sample_rate
+        preroll_ms = preroll_ms if preroll_ms is not None else int(os.environ.get("BMO_PREROLL_MS", 150))
+        self._preroll = deque(maxlen=max(int(preroll_ms / 1000 * sample_rate / frame_length), 1))
+        self._utterance: "queue.Queue[Sequence[int]]" = queue.Queue()
+        self._recording = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handler: Optional[FrameHandler] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def recording(self) -> bool:
+        return self._recording.is_set()
+
+    def start(self, handler: Optional[FrameHandler] = None) -> None:
+        self._handler = handler
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.running and threading.current_thread() is not self._thread:
+            self._thread.join()
+        self._thread = None
+        self.end_utterance()
+
+    def begin_utterance(self) -> None:
+        """Start queueing frames for recognition, beginning with the pre-roll."""
+
+        with self._lock:
+            self._drain()
+            for frame in self._preroll:
+                self._utterance.put(frame)
+            self._recording.set()
+
+    def end_utterance(self) -> None:
+        with self._lock:
+            self._recording.clear()
+            self._drain()
+
+    def read_frame(self, timeout: float = 0.5) -> Optional[Sequence[int]]:
+        try:
+            return self._utterance.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def record_utterance(
+        self,
+        endpointer: Endpointer,
+        should_abort: Callable[[], bool] = lambda: False,
+        on_frame: Optional[FrameHandler] = None,
+    ) -> bytes:
+        """Collect frames until ``endpointer`` reports the end of speech.
+
+        ``on_frame`` sees each frame as it is recorded, e.g. to stream it to
+        a recognizer. Returns the utterance as 16-bit PCM, or ``b""`` when
+        nobody spoke.
+        """
+
+        frames: List[Sequence[int]] = []
+        endpointer.reset()
+        try:
+            while not should_abort():
+                frame = self.read_frame()
+                if frame is None:
+                    if not self.running:
+                        break
+                    continue
+                frames.append(frame)
+                if on_frame is not None:
+                    on_frame(frame)
+                state = endpointer.process(frame)
+                if state == NO_SPEECH:
+                    return b""
+                if state == END:
+                    break
+        finally:
+            self.end_utterance()
+            endpointer.save()
+        return frames_to_pcm(frames)
+
+    def _run(self) -> None:
+        from pvrecorder import PvRecorder
+
+        recorder = PvRecorder(device_index=self.device_index, frame_length=self.frame_length)
+        recorder.start()
+        try:
+            while not self._stop_event.is_set():
+                frame = recorder.read()
+                if self._recording.is_set():
+                    self._utterance.put(frame)
+                else:
+                    self._preroll.append(frame)
+                if self._handler is not None:
+                    try:
+                        self._handler(frame)
+                    except Exception as exc:  # keep capturing; this is the only recorder thread
+                        print(f"Frame handler failed: {exc}")
+        finally:
+            recorder.stop()
+            recorder.delete()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                self._utterance.get_nowait()
+            except queue.Empty:
+                return
+
+
+def frames_to_pcm(frames: Sequence[Sequence[int]]) -> bytes:
+    if not frames:
+        return b""
+    return np.concatenate([np.asarray(frame, dtype="<i2") for frame in frames]).tobytes()
@@ -0,0 +1,177 @@
+"""Vectorized loudness envelopes for driving viseme animation."""
+
+import json
+import os
+import shutil
+import subprocess
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ENVELOPE_WINDOW = 0.08
+SIDECAR_SUFFIX = ".envelope.json"
+DECODE_RATE = 16000
+
+Envelope = List[Tuple[float, float]]
+
+
+def pcm_to_mono(data: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Convert interleaved little-endian PCM bytes into mono float32 samples."""
+
+    if sample_width == 1:
+        samples = np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+    elif sample_width == 3:
+        raw = np.frombuffer(data[: len(data) - len(data) % 3], dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = (raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)).astype(np.float32)
+        samples[samples >= 2 ** 23] -= 2 ** 24
+    elif sample_width == 4:
+        samples = np.frombuffer(data, dtype="<i4").astype(np.float32)
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+
+    if channels > 1:
+        usable = len(samples) - len(samples) % channels
+        samples = samples[:usable].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def decode_audio(path: str) -> Tuple[np.ndarray, int]:
+    """Decode a WAV, MP3 or OGG file into mono float32 samples and a sample rate.
+
+    WAV is read directly. Other formats use ``soundfile`` when it is installed
+    and fall back to an ``ffmpeg`` subprocess.
+    """
+
+    if path.lower().endswith(".wav"):
+        try:
+            with wave.open(path, "rb") as wav_file:
+                data = wav_file.readframes(wav_file.getnframes())
+                return pcm_to_mono(data, wav_file.getsampwidth(), wav_file.getnchannels()), wav_file.getframerate()
+        except wave.Error:
+            pass  # e.g. float or compressed WAV; let the general decoders try
+
+    try:
+        import soundfile
+    except ImportError:
+        soundfile = None
+    if soundfile is not None:
+        try:
+            samples, rate = soundfile.read(path, dtype="float32", always_2d=True)
+            return samples.mean(axis=1), rate
+        except RuntimeError:
+            pass
+
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError(f"No decoder available for {path}; install ffmpeg or soundfile")
+    completed = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(DECODE_RATE), "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    return pcm_to_mono(completed.stdout, 2, 1), DECODE_RATE
+
+
+def compute_envelope(samples: np.ndarray, rate: int, window: float = ENVELOPE_WINDOW) -> Envelope:
+    """Return ``(seconds, intensity)`` points of windowed RMS normalized to the peak."""
+
+    window_size = max(int(rate * window), 1)
+    count = -(-len(samples) // window_size)
+    if count == 0:
+        return []
+    padded = np.zeros(count * window_size, dtype=np.float32)
+    padded[: len(samples)] = samples
+    rms = np.sqrt(np.mean(np.square(padded.reshape(count, window_size)), axis=1))
+    peak = float(rms.max()) or 1.0
+    timestamps = np.arange(count) * (window_size / rate)
+    return list(zip(timestamps.tolist(), (rms / peak).tolist()))
+
+
+def load_envelope(path: str, duration: Optional[float] = None, persist: bool = True) -> Envelope:
+    """Return the envelope for ``path``, reusing a sidecar cache when it is fresh.
+
+    With ``persist`` the result is written to ``<path>.envelope.json`` and
+    reused until the audio file's size or modification time changes.
+    """
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return []
+
+    sidecar = path + SIDECAR_SUFFIX
+    points: Optional[Envelope] = None
+    if persist:
+        points = _read_sidecar(sidecar, stat)
+
+    if points is None:
+        try:
+            samples, rate = decode_audio(path)
+        except (RuntimeError, OSError, ValueError, EOFError, subprocess.CalledProcessError) as exc:
+            print(f"Could not analyze {path}: {exc}")
+            return []
+        points = compute_envelope(samples, rate)
+        if persist and points:
+            _write_sidecar(sidecar, stat, points)
+
+    if points and duration and points[-1][0] < duration:
+        points.append((duration, 0.0))
+    return points
+
+
+class EnvelopeAccumulator:
+    """Build an envelope incrementally from PCM that arrives in pieces.
+
+    Intensities are normalized to the loudest window seen so far, since the
+    true peak of a stream is not known until it ends.
+    """
+
+    def __init__(self, window: float = ENVELOPE_WINDOW) -> None:
+        self.window = window
+        self.points: Envelope = []
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._samples_seen = 0
+        self._peak = 1.0
+
+    def feed(self, pcm: bytes, sample_width: int, channels: int, rate: int) -> None:
+        samples = pcm_to_mono(pcm, sample_width, channels)
+        self._pending = np.concatenate((self._pending, samples))
+        window_size = max(int(rate * self.window), 1)
+        count = len(self._pending) // window_size
+        if count == 0:
+            return
+        windows = self._pending[: count * window_size].reshape(count, window_size)
+        self._pending = self._pending[count * window_size:]
+        rms = np.sqrt(np.mean(np.square(windows), axis=1))
+        for value in rms.tolist():
+            self._peak = max(self._peak, value)
+            self.points.append((self._samples_seen / rate, value / self._peak))
+            self._samples_seen += window_size
+
+
+def _read_sidecar(sidecar: str, stat: os.stat_result) -> Optional[Envelope]:
+    try:
+        with open(sidecar, "r", encoding="utf-8") as handle:
+            cached = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if cached.get("size") != stat.st_size or cached.get("mtime") != stat.st_mtime or cached.get("window") != ENVELOPE_WINDOW:
+        return None
+    return [tuple(point) for point in cached.get("points", [])]
+
+
+def _write_sidecar(sidecar: str, stat: os.stat_result, points: Envelope) -> None:
+    payload = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "window": ENVELOPE_WINDOW,
+        "points": [[round(t, 4), round(v, 4)] for t, v in points],
+    }
+    try:
+        with open(sidecar, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+    except OSError:
+        pass
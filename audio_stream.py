@@ -0,0 +1,139 @@
+"""Play WAV audio from a chunk iterator while it is still being downloaded."""
+
+import struct
+import threading
+from typing import Callable, Iterable, Optional
+
+from audio_envelope import ENVELOPE_WINDOW, EnvelopeAccumulator
+
+
+class WavStreamParser:
+    """Incrementally strip the RIFF header from a streamed WAV body.
+
+    Streamed WAV responses often carry placeholder sizes in their headers, so
+    the ``data`` chunk is treated as running until the stream ends.
+    """
+
+    def __init__(self) -> None:
+        self.channels: Optional[int] = None
+        self.sample_rate: Optional[int] = None
+        self.sample_width: Optional[int] = None
+        self.header_ready = False
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Return the PCM bytes contained in ``chunk`` once the header is parsed."""
+
+        if self.header_ready:
+            return chunk
+        self._buffer += chunk
+        if len(self._buffer) < 12:
+            return b""
+        if self._buffer[:4] != b"RIFF" or self._buffer[8:12] != b"WAVE":
+            raise ValueError("Streamed audio is not a WAV file")
+
+        offset = 12
+        while len(self._buffer) >= offset + 8:
+            chunk_id = self._buffer[offset:offset + 4]
+            (chunk_size,) = struct.unpack("<I", self._buffer[offset + 4:offset + 8])
+            body_start = offset + 8
+            if chunk_id == b"data":
+                if self.sample_rate is None:
+                    raise ValueError("WAV data chunk arrived before its fmt chunk")
+                self.header_ready = True
+                pcm = self._buffer[body_start:]
+                self._buffer = b""
+                return pcm
+            if len(self._buffer) < body_start + chunk_size:
+                return b""
+            if chunk_id == b"fmt ":
+                _, channels, rate, _, _, bits = struct.unpack(
+                    "<HHIIHH", self._buffer[body_start:body_start + 16]
+                )
+                self.channels = channels
+                self.sample_rate = rate
+                self.sample_width = bits // 8
+            offset = body_start + chunk_size + (chunk_size & 1)
+        return b""
+
+
+class StreamingPlayer:
+    """Write PCM to the sound card as chunks arrive and track its loudness.
+
+    ``envelope`` grows with ``(seconds, intensity)`` points as audio is played
+    so viseme animation can follow the stream without waiting for the end.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        on_start: Optional[Callable[[], None]] = None,
+        on_finish: Optional[Callable[[Optional[BaseException]], None]] = None,
+        window: float = ENVELOPE_WINDOW,
+    ) -> None:
+        self.chunks = chunks
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self._accumulator = EnvelopeAccumulator(window)
+        self.envelope = self._accumulator.points
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import pyaudio  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def _run(self) -> None:
+        import pyaudio
+
+        parser = WavStreamParser()
+        remainder = b""
+        audio = None
+        output = None
+        error: Optional[BaseException] = None
+        try:
+            for chunk in self.chunks:
+                if self._stop_event.is_set():
+                    break
+                pcm = remainder + parser.feed(chunk)
+                frame_bytes = (parser.sample_width or 1) * (parser.channels or 1)
+                usable = len(pcm) - len(pcm) % frame_bytes
+                pcm, remainder = pcm[:usable], pcm[usable:]
+                if not pcm:
+                    continue
+                if output is None:
+                    audio = pyaudio.PyAudio()
+                    output = audio.open(
+                        format=audio.get_format_from_width(parser.sample_width),
+                        channels=parser.channels,
+                        rate=parser.sample_rate,
+                        output=True,
+                    )
+                    if self.on_start:
+                        self.on_start()
+                self._accumulator.feed(pcm, parser.sample_width, parser.channels, parser.sample_rate)
+                output.write(pcm)
+        except BaseException as exc:  # pragma: no cover - surfaced to the caller
+            error = exc
+        finally:
+            close = getattr(self.chunks, "close", None)
+            if close:
+                close()
+            if output is not None:
+                output.stop_stream()
+                output.close()
+            if audio is not None:
+                audio.terminate()
+            if self.on_finish:
+                self.on_finish(error)
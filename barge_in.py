@@ -0,0 +1,129 @@
+"""Echo-aware gating of wake-word detections heard while BMO is playing audio."""
+
+import bisect
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Sequence, Tuple
+
+from endpointing import frame_rms
+
+Envelope = Sequence[Tuple[float, float]]
+
+
+class EchoGate:
+    """Reject wake-word detections that BMO's own speaker could have caused.
+
+    While audio plays, each microphone frame is compared with the known
+    loudness of the output at that moment. Frames where nobody else is
+    talking teach the gate how loud the speaker's echo is for a given output
+    level. A detection is accepted only if the microphone recently peaked
+    ``margin`` times above the echo predicted from the output, i.e. someone
+    spoke over BMO rather than BMO saying something wake-word shaped.
+
+    Background music is tracked separately from BMO's own speech: speech
+    takes over the gate while it plays and hands it back to the song, if one
+    is still playing, when it stops.
+    """
+
+    def __init__(self, margin: Optional[float] = None, window_ms: int = 600, frame_ms: float = 32.0) -> None:
+        self.margin = margin if margin is not None else float(os.environ.get("BMO_BARGE_IN_MARGIN", 2.0))
+        # Start high and let quiet frames pull it down, so early playback can't self-trigger.
+        self.echo_gain = 1000.0
+        self._recent = deque(maxlen=max(int(window_ms / frame_ms), 1))
+        self._envelope: Optional[Envelope] = None
+        self._started = 0.0
+        self._music: Optional[Tuple[Envelope, float]] = None
+        self._speaking = False
+        # Playback starts and stops on the UI and music threads; frames arrive on the capture thread.
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self._envelope is not None
+
+    def start_playback(self, envelope: Optional[Envelope], started: Optional[float] = None) -> None:
+        """Track output loudness from ``envelope``; pass ``[]`` when it is not known yet."""
+
+        with self._lock:
+            self._speaking = True
+            self._track(envelope, started)
+
+    def stop_playback(self) -> None:
+        """Stop tracking BMO's speech and fall back to the music, if any is playing."""
+
+        with self._lock:
+            self._speaking = False
+            if self._music is not None:
+                self._track(*self._music)
+            else:
+                self._envelope = None
+                self._recent.clear()
+
+    def start_music(self, envelope: Optional[Envelope], started: float) -> None:
+        """Track a song (or its resumption); BMO's speech still takes precedence while it plays."""
+
+        with self._lock:
+            self._music = (envelope if envelope is not None else [], started)
+            if not self._speaking:
+                self._track(*self._music)
+
+    def stop_music(self) -> None:
+        """Forget the song, e.g. when it is paused or the queue finishes."""
+
+        with self._lock:
+            self._music = None
+            if not self._speaking:
+                self._envelope = None
+                self._recent.clear()
+
+    def _track(self, envelope: Optional[Envelope], started: Optional[float]) -> None:
+        self._envelope = envelope if envelope is not None else []
+        self._started = time.time() if started is None else started
+        self._recent.clear()
+
+    def output_level(self, now: Optional[float] = None) -> float:
+        """Normalized output loudness right now; 1.0 when playing audio with an unknown envelope."""
+
+        with self._lock:
+            envelope, started = self._envelope, self._started
+        if envelope is None:
+            return 0.0
+        if not envelope:
+            return 1.0
+        elapsed = (time.time() if now is None else now) - started
+        index = bisect.bisect_right(envelope, (elapsed, math.inf))
+        return float(envelope[max(index - 1, 0)][1])
+
+    def observe(self, frame: Sequence[int], noise_floor: float) -> None:
+        """Record one microphone frame heard during playback."""
+
+        if self._envelope is None:
+            return
+        rms = frame_rms(frame)
+        level = self.output_level()
+        with self._lock:
+            if self._envelope is None:
+                return
+            self._recent.append((rms, level))
+        if level >= 0.2:
+            # Rise slowly so a person talking over BMO barely moves the estimate.
+            sample = max(rms - noise_floor, 0.0) / level
+            rate = 0.05 if sample < self.echo_gain else 0.01
+            self.echo_gain += (sample - self.echo_gain) * rate
+
+    def allows(self, noise_floor: float) -> bool:
+        """Whether a detection at this moment should interrupt playback."""
+
+        with self._lock:
+            if self._envelope is None:
+                return True
+            recent = list(self._recent)
+        if not recent:
+            return False
+        peak_rms = max(rms for rms, _ in recent)
+        loudest_output = max(level for _, level in recent)
+        expected = noise_floor + self.echo_gain * loudest_output
+        return peak_rms >= self.margin * expected
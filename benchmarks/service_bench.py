@@ -0,0 +1,212 @@
+"""Benchmark routing and TTS against local stand-in Ollama and Fish Audio servers.
+
+Run from the repository root::
+
+    python benchmarks/service_bench.py
+    python benchmarks/service_bench.py --concurrency 1 4 --requests 40 --save bench.json
+    python benchmarks/service_bench.py --baseline bench.json   # exit 1 on a p95 regression
+
+No network access or API keys are needed. Scenarios drive the real
+``CommandRouter.route_command`` and ``FishAudioClient.synthesize_to_path`` /
+``synthesize_stream`` code paths headlessly at each concurrency level. Tool
+handlers are replaced with no-ops so nothing is launched.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["BMO_FAST_PATH"] = "0"  # measure the LLM path, not the local intent index
+os.environ["BMO_TRACE"] = "0"
+os.environ["FISH_AUDIO_CACHE"] = "0"  # scenarios that want the clip cache pass one explicitly
+
+from command_router import SINGLE_PASS, TWO_PASS, CommandRouter  # noqa: E402
+from conversation import ConversationMemory  # noqa: E402
+from fish_audio import FishAudioClient  # noqa: E402
+from http_pool import create_session  # noqa: E402
+from rom_library import RomLibrary  # noqa: E402
+from stub_servers import FishBehaviour, OllamaBehaviour, fish_server, ollama_server  # noqa: E402
+from tts_cache import TTSClipCache  # noqa: E402
+from turn_report import PERCENTILES, percentile  # noqa: E402
+
+CHAT_PROMPT = "tell me about your day"
+TOOL_PROMPT = "launch the music player"
+SENTENCES = (
+    "Hello friend!",
+    "BMO wants to play a game with you right now.",
+    "Did you know that BMO can also be a camera, an alarm clock and a toaster?",
+)
+
+# Each sample is (total seconds, first-output seconds or None, ok).
+Sample = Tuple[float, float, bool]
+
+
+def run_concurrently(task: Callable[[int], Sample], requests: int, concurrency: int) -> Tuple[List[Sample], float]:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(task, range(requests)))
+    return samples, time.perf_counter() - started
+
+
+def make_router(ollama_url: str, routing_mode: str, pool_size: int, state_dir: str) -> CommandRouter:
+    """A router with no conversation history and its ROM index kept inside ``state_dir``.
+
+    History would grow the prompt, and with it the latency, over the run.
+    """
+
+    router = CommandRouter(
+        base_url=ollama_url,
+        routing_mode=routing_mode,
+        session=create_session(pool_size),
+        memory=ConversationMemory(token_budget=0),
+        rom_library=RomLibrary(directories=[state_dir], index_path=os.path.join(state_dir, "roms.json")),
+    )
+    router.tool_handlers = {name: (lambda name=name, **_: f"{name} done") for name in router.tool_handlers}
+    return router
+
+
+def route_task(router: CommandRouter, prompt: str, stream: bool) -> Callable[[int], Sample]:
+    def _task(_: int) -> Sample:
+        first: List[float] = []
+        started = time.perf_counter()
+        on_text = (lambda delta: first or first.append(time.perf_counter())) if stream else None
+        result = router.route_command(prompt, on_text=on_text)
+        total = time.perf_counter() - started
+        ok = not result.content.startswith("I ran into a glitch")
+        return total, (first[0] - started if first else None), ok
+
+    return _task
+
+
+def tts_task(client: FishAudioClient, stream: bool, unique: bool) -> Callable[[int], Sample]:
+    def _task(index: int) -> Sample:
+        text = SENTENCES[index % len(SENTENCES)]
+        if unique:
+            text = f"{text} ({index} {time.perf_counter_ns()})"
+        started = time.perf_counter()
+        first = None
+        try:
+            if stream:
+                for _ in client.synthesize_stream(text):
+                    if first is None:
+                        first = time.perf_counter() - started
+            else:
+                client.release_path(client.synthesize_to_path(text))
+        except Exception as exc:  # pragma: no cover - reported as a failed sample
+            print(f"TTS request failed: {exc}")
+            return time.perf_counter() - started, first, False
+        return time.perf_counter() - started, first, True
+
+    return _task
+
+
+def summarize(samples: List[Sample], wall: float) -> Dict[str, float]:
+    totals = sorted(sample[0] * 1000 for sample in samples)
+    firsts = sorted(sample[1] * 1000 for sample in samples if sample[1] is not None)
+    summary = {f"p{pct}_ms": percentile(totals, pct) for pct in PERCENTILES}
+    summary["max_ms"] = totals[-1]
+    if firsts:
+        summary.update({f"first_p{pct}_ms": percentile(firsts, pct) for pct in PERCENTILES})
+    summary["errors"] = sum(1 for sample in samples if not sample[2])
+    summary["per_second"] = len(samples) / wall if wall else 0.0
+    return summary
+
+
+def run(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    ollama_behaviour = OllamaBehaviour(first_token_delay=args.llm_delay, token_delay=args.token_delay)
+    fish_behaviour = FishBehaviour(first_byte_delay=args.tts_delay, bytes_per_second=args.tts_throughput)
+    results: Dict[str, Dict[str, float]] = {}
+
+    with ollama_server(ollama_behaviour) as ollama, fish_server(fish_behaviour) as fish, \
+            tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as state_dir:
+        for concurrency in args.concurrency:
+            scenarios: Dict[str, Callable[[int], Sample]] = {}
+            for mode in (SINGLE_PASS, TWO_PASS):
+                router = make_router(ollama.url, mode, concurrency, state_dir)
+                for stream in (False, True):
+                    suffix = "stream" if stream else "blocking"
+                    scenarios[f"route {mode} chat {suffix}"] = route_task(router, CHAT_PROMPT, stream)
+                    scenarios[f"route {mode} tool {suffix}"] = route_task(router, TOOL_PROMPT, stream)
+
+            uncached = FishAudioClient(api_key="bench", base_url=fish.url, max_workers=concurrency)
+            cached = FishAudioClient(
+                api_key="bench", base_url=fish.url, cache=TTSClipCache(directory=cache_dir), max_workers=concurrency
+            )
+            scenarios["tts synthesize_to_path"] = tts_task(uncached, stream=False, unique=True)
+            scenarios["tts synthesize_stream"] = tts_task(uncached, stream=True, unique=True)
+            scenarios["tts cached synthesize_to_path"] = tts_task(cached, stream=False, unique=False)
+            for sentence in SENTENCES:
+                cached.synthesize_to_path(sentence)  # the cached scenario measures hits only
+
+            for name, task in scenarios.items():
+                if args.only and not any(word in name for word in args.only):
+                    continue
+                samples, wall = run_concurrently(task, args.requests, concurrency)
+                results[f"{name} x{concurrency}"] = summarize(samples, wall)
+            uncached.shutdown()
+            cached.shutdown()
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    columns = [f"p{pct}_ms" for pct in PERCENTILES] + ["max_ms", "first_p50_ms", "errors", "per_second"]
+    header = f"{'scenario':<42}" + "".join(f"{column:>14}" for column in columns)
+    print(header)
+    print("-" * len(header))
+    for name, summary in results.items():
+        cells = "".join(
+            f"{summary[column]:>14.1f}" if column in summary else f"{'-':>14}" for column in columns
+        )
+        print(f"{name:<42}{cells}")
+
+
+def check_baseline(results: Dict[str, Dict[str, float]], baseline_path: str, tolerance: float) -> bool:
+    with open(baseline_path, "r", encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    ok = True
+    for name, summary in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if summary["p95_ms"] > limit or summary["errors"] > previous.get("errors", 0):
+            print(
+                f"REGRESSION {name}: p95 {summary['p95_ms']:.1f}ms vs baseline {previous['p95_ms']:.1f}ms, "
+                f"{summary['errors']} errors"
+            )
+            ok = False
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=20, help="requests per scenario and concurrency level")
+    parser.add_argument("--llm-delay", type=float, default=0.25, help="stand-in Ollama time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="stand-in Ollama time per token (s)")
+    parser.add_argument("--tts-delay", type=float, default=0.15, help="stand-in Fish Audio time to first byte (s)")
+    parser.add_argument("--tts-throughput", type=int, default=256000, help="stand-in Fish Audio bytes per second")
+    parser.add_argument("--only", nargs="+", default=[], help="run scenarios whose name contains any of these words")
+    parser.add_argument("--save", help="write the results as JSON for use as a baseline")
+    parser.add_argument("--baseline", help="compare against saved results and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown against the baseline")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_results(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.baseline and not check_baseline(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Local stand-ins for the Ollama chat API and the Fish Audio TTS API.
+
+The servers answer with canned but realistically shaped responses and
+configurable delays so routing and synthesis can be benchmarked offline and
+reproducibly. Both speak HTTP/1.1 with keep-alive, like the real services.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+TOOL_KEYWORDS = ("launch", "open", "play a game", "start")
+REPLY_TEXT = (
+    "BMO is so happy you asked! Today BMO played three games with Football and won every single one. "
+    "Then BMO made pancakes, but they were shaped like tiny robots. Do you want to hear a song next?"
+)
+
+
+@dataclass
+class OllamaBehaviour:
+    """Timing of the stand-in Ollama server, in seconds."""
+
+    first_token_delay: float = 0.25
+    token_delay: float = 0.02
+    tokens_per_chunk: int = 1
+
+
+@dataclass
+class FishBehaviour:
+    """Timing of the stand-in Fish Audio server."""
+
+    first_byte_delay: float = 0.15
+    bytes_per_second: int = 256000
+    seconds_per_char: float = 0.06
+    sample_rate: int = 22050
+    chunk_size: int = 4096
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - signature from BaseHTTPRequestHandler
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading early, e.g. an abandoned tool-decision stream
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, body: Dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunked(self, content_type: str, pieces: Iterable[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for piece in pieces:
+            self.wfile.write(f"{len(piece):x}\r\n".encode("ascii") + piece + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _OllamaHandler(_StubHandler):
+    behaviour = OllamaBehaviour()
+    _last_prompts: Dict[str, str] = {}
+
+    def _prompt_eval_count(self, payload: Dict) -> int:
+        """Tokens past the prefix shared with this model's previous prompt, like Ollama's prompt cache."""
+
+        prompt = json.dumps(payload.get("tools")) + json.dumps(payload.get("messages"))
+        previous = self._last_prompts.get(payload.get("model"), "")
+        self._last_prompts[payload.get("model")] = prompt
+        shared = len(os.path.commonprefix([prompt, previous]))
+        return (len(prompt) - shared) // 4 + 1
+
+    def do_POST(self):  # noqa: N802 - http.server naming
+        payload = self._read_json()
+        if self.path == "/api/generate":
+            self._send_json({"done": True, "load_duration": 0})
+            return
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+
+        behaviour = self.behaviour
+        prompt_tokens = self._prompt_eval_count(payload)
+        messages = payload.get("messages") or [{}]
+        user_text = (messages[-1].get("content") or "").lower()
+        wants_tool = bool(payload.get("tools")) and any(word in user_text for word in TOOL_KEYWORDS)
+        tokens = [] if wants_tool else [word + " " for word in REPLY_TEXT.split()]
+        tool_calls = [
+            {"function": {"name": "launch_application", "arguments": {"command": "benchmark-noop"}}}
+        ] if wants_tool else []
+
+        if not payload.get("stream", True):
+            time.sleep(behaviour.first_token_delay + behaviour.token_delay * len(tokens))
+            message = {"role": "assistant", "content": "".join(tokens).strip()}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            self._send_json({"model": payload.get("model"), "message": message, "done": True, **_eval_stats(tokens, prompt_tokens, behaviour)})
+            return
+
+        def _lines():
+            time.sleep(behaviour.first_token_delay)
+            if tool_calls:
+                message = {"role": "assistant", "content": "", "tool_calls": tool_calls}
+                yield json.dumps({"message": message, "done": False}).encode("utf-8") + b"\n"
+            step = max(behaviour.tokens_per_chunk, 1)
+            for index in range(0, len(tokens), step):
+                if index:
+                    time.sleep(behaviour.token_delay * step)
+                message = {"role": "assistant", "content": "".join(tokens[index:index + step])}
+                yield json.dumps({"message": message, "done": False}).encode("utf-8") + b"\n"
+            final = {"message": {"role": "assistant", "content": ""}, "done": True, **_eval_stats(tokens, prompt_tokens, behaviour)}
+            yield json.dumps(final).encode("utf-8") + b"\n"
+
+        self._send_chunked("application/x-ndjson", _lines())
+
+
+def _eval_stats(tokens, prompt_tokens: int, behaviour: OllamaBehaviour) -> Dict[str, int]:
+    """The generation counters Ollama reports on its final chunk."""
+
+    return {
+        "eval_count": len(tokens),
+        "eval_duration": int(behaviour.token_delay * len(tokens) * 1e9),
+        "prompt_eval_count": prompt_tokens,
+        "load_duration": 0,
+    }
+
+
+class _FishHandler(_StubHandler):
+    behaviour = FishBehaviour()
+
+    def do_HEAD(self):  # noqa: N802 - http.server naming
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):  # noqa: N802 - http.server naming
+        payload = self._read_json()
+        if not self.path.endswith("/tts"):
+            self.send_error(404)
+            return
+        behaviour = self.behaviour
+        text = payload.get("text") or ""
+        body = _wav_bytes(round(max(len(text) * behaviour.seconds_per_char, 0.2), 2), behaviour.sample_rate)
+
+        time.sleep(behaviour.first_byte_delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        pause = behaviour.chunk_size / behaviour.bytes_per_second if behaviour.bytes_per_second else 0.0
+        for offset in range(0, len(body), behaviour.chunk_size):
+            if offset and pause:
+                time.sleep(pause)
+            self.wfile.write(body[offset:offset + behaviour.chunk_size])
+            self.wfile.flush()
+
+
+@lru_cache(maxsize=64)
+def _wav_bytes(seconds: float, sample_rate: int) -> bytes:
+    """A mono 16-bit WAV of a warbling tone, so envelopes have something to follow."""
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pcm = (12000 * (0.5 + 0.5 * np.sin(t * 8)) * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    )
+    return header + pcm
+
+
+class StubServer:
+    """Run one stand-in server on a background thread; usable as a context manager."""
+
+    def __init__(self, handler: type, behaviour, host: str = "127.0.0.1", port: int = 0) -> None:
+        handler_class = type(handler.__name__, (handler,), {"behaviour": behaviour})
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def ollama_server(behaviour: Optional[OllamaBehaviour] = None, **kwargs) -> StubServer:
+    return StubServer(_OllamaHandler, behaviour or OllamaBehaviour(), **kwargs)
+
+
+def fish_server(behaviour: Optional[FishBehaviour] = None, **kwargs) -> StubServer:
+    return StubServer(_FishHandler, behaviour or FishBehaviour(), **kwargs)
@@ -0,0 +1,100 @@
+"""Summarize per-stage turn latency from BMO's JSONL turn traces.
+
+Run from the repository root::
+
+    python benchmarks/turn_report.py [~/.cache/bmo/turns.jsonl]
+
+Rotated logs (``turns.jsonl.1`` and so on) are read too. Each stage is
+reported over every span recorded for it, so a reply spoken as three
+sentences contributes three ``tts`` samples. ``turn`` is the whole turn from
+wake word to the end of playback.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from turn_trace import TurnTracer  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+PIPELINE = ("turn", "wake", "capture", "stt", "route", "ollama", "tool", "tts", "sound_load", "playback_start")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def read_turns(path: str) -> Iterable[Dict]:
+    for log_path in sorted(glob.glob(glob.escape(path) + "*"), reverse=True):
+        with open(log_path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def collect(turns: Iterable[Dict], outcomes: Iterable[str]) -> Dict[str, List[float]]:
+    wanted = set(outcomes)
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for turn in turns:
+        if wanted and turn.get("outcome") not in wanted:
+            continue
+        samples["turn"].append(turn["total_ms"])
+        for span in turn.get("spans", []):
+            samples[span["stage"]].append(span["duration_ms"])
+            if "first_byte_ms" in span:
+                samples[f"{span['stage']}_first_byte"].append(span["first_byte_ms"])
+            if "first_chunk_ms" in span:
+                samples[f"{span['stage']}_first_token"].append(span["first_chunk_ms"])
+    return samples
+
+
+def _pipeline_position(stage: str) -> int:
+    for position, prefix in enumerate(PIPELINE):
+        if stage.startswith(prefix):
+            return position
+    return len(PIPELINE)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=TurnTracer(enabled=False).path)
+    parser.add_argument(
+        "--outcome",
+        action="append",
+        default=[],
+        help="only include turns with this outcome (done, cancelled, interrupted, ...); repeatable",
+    )
+    args = parser.parse_args()
+
+    samples = collect(read_turns(os.path.expanduser(args.path)), args.outcome)
+    if not samples:
+        print(f"No turns found in {args.path}")
+        return
+
+    header = f"{'stage':<28}{'count':>7}" + "".join(f"{'p' + str(pct) + ' ms':>11}" for pct in PERCENTILES)
+    print(header)
+    print("-" * len(header))
+    ordered = sorted(samples.items(), key=lambda item: (_pipeline_position(item[0]), item[0]))
+    for stage, values in ordered:
+        values.sort()
+        row = "".join(f"{percentile(values, pct):>11.0f}" for pct in PERCENTILES)
+        print(f"{stage:<28}{len(values):>7}{row}")
+
+
+if __name__ == "__main__":
+    main()
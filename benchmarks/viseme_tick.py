@@ -0,0 +1,73 @@
+"""Compare per-tick viseme lookup cost for short and long clips.
+
+Run from the repository root::
+
+    python benchmarks/viseme_tick.py
+
+The legacy path scans the envelope from the start on every tick, so its cost
+grows with clip length; the compiled timeline stays flat.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_envelope import ENVELOPE_WINDOW  # noqa: E402
+from viseme_timeline import SMOOTHING, VISEME_FPS, VisemeTimeline  # noqa: E402
+
+FRAME_COUNT = 21
+CLIP_SECONDS = (5, 30, 120, 600)
+
+
+def legacy_frame(points, elapsed, state):
+    target = points[-1][1]
+    for idx, (timestamp, value) in enumerate(points):
+        if elapsed <= timestamp:
+            if idx == 0:
+                target = value
+            else:
+                prev_t, prev_v = points[idx - 1]
+                progress = (elapsed - prev_t) / max(timestamp - prev_t, 1e-6)
+                target = prev_v + (value - prev_v) * progress
+            break
+    state[0] += (target - state[0]) * SMOOTHING
+    return min(int(round(state[0] * (FRAME_COUNT - 1))), FRAME_COUNT - 1)
+
+
+def make_envelope(seconds):
+    count = int(seconds / ENVELOPE_WINDOW)
+    return [(i * ENVELOPE_WINDOW, random.random()) for i in range(count)]
+
+
+def main():
+    random.seed(0)
+    print(f"{'clip (s)':>9} {'points':>7} {'legacy us/tick':>15} {'timeline us/tick':>17} {'compile ms':>11} {'max diff':>9}")
+    for seconds in CLIP_SECONDS:
+        points = make_envelope(seconds)
+        ticks = [i / VISEME_FPS for i in range(int(seconds * VISEME_FPS))]
+
+        state = [0.0]
+        started = time.perf_counter()
+        legacy = [legacy_frame(points, elapsed, state) for elapsed in ticks]
+        legacy_us = (time.perf_counter() - started) / len(ticks) * 1e6
+
+        started = time.perf_counter()
+        timeline = VisemeTimeline.compile(points, FRAME_COUNT)
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        compiled = [timeline.frame_at(elapsed) for elapsed in ticks]
+        timeline_us = (time.perf_counter() - started) / len(ticks) * 1e6
+
+        # Past the last envelope point the timeline holds its final frame, so
+        # only ticks inside the envelope are compared.
+        covered = len(timeline.frames)
+        max_diff = max(abs(a - b) for a, b in zip(legacy[:covered], compiled[:covered]))
+        print(f"{seconds:>9} {len(points):>7} {legacy_us:>15.2f} {timeline_us:>17.2f} {compile_ms:>11.2f} {max_diff:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Run BMO's voice assistant without a display.
+
+Usage::
+
+    python bmo_daemon.py
+
+The same :class:`VoicePipeline` as the Kivy app handles the wake word,
+speech-to-text, routing and TTS. Replies are played straight to the sound
+card through PyAudio, so no face animation and no Kivy import are needed.
+Useful as a systemd service or for testing the voice path over SSH.
+"""
+
+import time
+
+BOOT_STARTED = time.perf_counter()
+
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import threading
+from concurrent.futures import Future
+from typing import Iterator, Optional
+
+from audio_stream import StreamingPlayer
+from sentences import SentenceAccumulator
+from turn_trace import tracer
+from turn_worker import Turn, TurnCancelled
+from voice_pipeline import PipelineHost, StartupTimer, VoicePipeline
+
+_END_OF_TURN = object()
+
+
+def wav_chunks(path: str, chunk_size: int = 8192) -> Iterator[bytes]:
+    """Yield ``path`` as WAV bytes, decoding other formats through ffmpeg."""
+
+    if path.lower().endswith(".wav"):
+        with open(path, "rb") as handle:
+            yield from iter(lambda: handle.read(chunk_size), b"")
+        return
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError(f"ffmpeg is needed to play {path} without Kivy")
+    process = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "wav", "-"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield from iter(lambda: process.stdout.read(chunk_size), b"")
+    finally:
+        process.kill()
+        process.wait()
+
+
+class HeadlessBMO(PipelineHost):
+    """Speak routed replies through PyAudio, one clip after another."""
+
+    def __init__(self, startup: Optional[StartupTimer] = None) -> None:
+        self.voice = VoicePipeline(self, startup)
+        self._clips: "queue.Queue[object]" = queue.Queue()
+        self._busy = threading.Event()
+        self._player: Optional[StreamingPlayer] = None
+        self._stopping = threading.Event()
+        self._speaker = threading.Thread(target=self._play_clips, daemon=True)
+
+    def start(self) -> None:
+        self._speaker.start()
+        self.voice.warm_up()
+        self.voice.command_enabled = True
+        self.voice.start_listening()
+        print("BMO is listening (headless).")
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.interrupt()
+        self._clips.put(_END_OF_TURN)
+        self.voice.shutdown()
+
+    def is_busy(self) -> bool:
+        return self._busy.is_set()
+
+    def handle_command(self, text: str, turn: Turn) -> None:
+        print(f"You: {text}")
+        self._busy.set()
+        accumulator = SentenceAccumulator()
+        spoken = []
+        tts_client = self.voice.tts_client
+
+        def _speak(sentences):
+            for sentence in sentences:
+                turn.check()
+                spoken.append(sentence)
+                self._clips.put(tts_client.submit(sentence))
+
+        try:
+            with tracer.span("route", streamed=True):
+                routed = self.voice.command_router.route_command(
+                    text, on_text=lambda delta: _speak(accumulator.feed(delta))
+                )
+            _speak(accumulator.flush())
+            if routed.audio_path:
+                print(f"BMO: <{os.path.basename(routed.audio_path)}>")
+                self._clips.put(routed.audio_path)
+        except TurnCancelled:
+            raise
+        except Exception as exc:  # pragma: no cover - runtime guard
+            print(f"Error while processing command: {exc}")
+        finally:
+            if spoken:
+                print(f"BMO: {' '.join(spoken)}")
+            if not turn.cancelled:
+                self._clips.put(_END_OF_TURN)
+
+    def handle_unrecognized(self, turn: Turn, fatal: bool) -> None:
+        self._busy.set()
+        self._clips.put("./responses/fatal-error.wav" if fatal else "./responses/unknown-value-error.wav")
+        self._clips.put(_END_OF_TURN)
+
+    def interrupt(self) -> None:
+        self.voice.cancel_current_turn()
+        while True:
+            try:
+                pending = self._clips.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(pending, Future):
+                pending.cancel()
+                pending.add_done_callback(self._release_unplayed)
+        player = self._player
+        if player is not None:
+            player.stop()
+        self._busy.clear()
+        tracer.finish("cancelled")
+
+    def _release_unplayed(self, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.voice.tts_client.release_path(future.result())
+
+    def _play_clips(self) -> None:
+        while not self._stopping.is_set():
+            item = self._clips.get()
+            if item is _END_OF_TURN:
+                if self._clips.empty():
+                    self._busy.clear()
+                    tracer.finish("done")
+                    self.voice.music.resume()
+                continue
+            try:
+                path = item.result() if isinstance(item, Future) else item
+            except Exception as exc:  # pragma: no cover - includes cancelled futures
+                print(f"Fish Audio request failed: {exc}")
+                continue
+            try:
+                self._play(path)
+            finally:
+                if isinstance(item, Future):
+                    self.voice.tts_client.release_path(path)
+
+    def _play(self, path: str) -> None:
+        finished = threading.Event()
+
+        def _on_start():
+            tracer.mark("playback_start")
+            self.voice.echo_gate.start_playback(player.envelope)
+
+        def _on_finish(error):
+            if error is not None:
+                print(f"Could not play {path}: {error}")
+            finished.set()
+
+        player = StreamingPlayer(wav_chunks(path), on_start=_on_start, on_finish=_on_finish)
+        self._player = player
+        player.start()
+        finished.wait()
+        self._player = None
+        self.voice.echo_gate.stop_playback()
+
+
+def main() -> None:
+    startup = StartupTimer(BOOT_STARTED)
+    startup.mark("imports")
+    bmo = HeadlessBMO(startup)
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    bmo.start()
+    while not stop.wait(1):
+        pass
+    bmo.stop()
+
+
+if __name__ == "__main__":
+    main()
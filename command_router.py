@@ -1,12 +1,26 @@
 import json
 import os
+import random
 import shlex
-import subprocess
+import threading
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Generator, Iterator, List, Optional
 
 import requests
 
+from conversation import ConversationMemory
+from http_pool import create_session
+from intent_index import IntentIndex, build_default_index, normalize
+from process_supervisor import GAME, SYSTEM, ProcessSupervisor
+from rom_library import PLATFORM_ALIASES, RomEntry, RomLibrary
+from song_queue import SongQueue
+from turn_trace import tracer
+
+SINGLE_PASS = "single"
+TWO_PASS = "two_pass"
+ROUTING_MODES = (SINGLE_PASS, TWO_PASS)
+
 
 @dataclass
 class RoutedResult:
@@ -14,23 +28,96 @@ class RoutedResult:
 
     content: str
     used_tool: Optional[str] = None
+    audio_path: Optional[str] = None
 
 
 class CommandRouter:
-    """Send parsed intents to Ollama with tool-calling support."""
+    """Send parsed intents to Ollama with tool-calling support.
+
+    In ``single`` routing mode one request carries both the persona and the
+    tool schema, so the model either calls a tool or answers in character.
+    ``two_pass`` mode asks a tool router first and then makes a separate
+    persona request for plain replies.
+
+    The tool router and the persona can run on different models: a small
+    ``tool_model`` capped to a short output and a tight context for fast
+    dispatch, and a larger ``persona_model`` for BMO's replies. Single-pass
+    requests use the persona model. Setting a distinct tool model without an
+    explicit routing mode selects ``two_pass``.
 
-    def __init__(self, model: Optional[str] = None, base_url: Optional[str] = None):
+    Replies produced by the LLM are kept in a :class:`ConversationMemory` and
+    sent back on later persona and single-pass requests. Every request starts
+    with the same system prompt and tool list, followed by the history, so
+    Ollama can reuse the evaluated prompt prefix between turns. The tool
+    router only sees the new utterance to keep its context small.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        routing_mode: Optional[str] = None,
+        intent_index: Optional[IntentIndex] = None,
+        session: Optional[requests.Session] = None,
+        tool_model: Optional[str] = None,
+        persona_model: Optional[str] = None,
+        memory: Optional[ConversationMemory] = None,
+        rom_library: Optional[RomLibrary] = None,
+        music: Optional[SongQueue] = None,
+        processes: Optional[ProcessSupervisor] = None,
+    ):
         self.model = model or os.environ.get("OLLAMA_MODEL", "llama3.1")
+        self.tool_model = tool_model or os.environ.get("OLLAMA_TOOL_MODEL") or self.model
+        self.persona_model = persona_model or os.environ.get("OLLAMA_PERSONA_MODEL") or self.model
+        self.tool_options = {
+            "num_predict": int(os.environ.get("OLLAMA_TOOL_NUM_PREDICT", 96)),
+            "num_ctx": int(os.environ.get("OLLAMA_TOOL_NUM_CTX", 2048)),
+            "temperature": 0,
+        }
+        self.persona_options = {"num_ctx": int(os.environ.get("OLLAMA_PERSONA_NUM_CTX", 4096))}
         self.base_url = base_url or os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+        default_mode = TWO_PASS if self.tool_model != self.persona_model else SINGLE_PASS
+        self.routing_mode = routing_mode or os.environ.get("OLLAMA_ROUTING_MODE", default_mode)
+        if self.routing_mode not in ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode {self.routing_mode!r}; expected one of {ROUTING_MODES}")
+        self.keep_alive = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+        self.session = session or create_session(int(os.environ.get("OLLAMA_POOL_SIZE", 2)))
+        self.memory = memory or ConversationMemory()
+        self.rom_library = rom_library or RomLibrary()
+        self.rom_match_threshold = float(os.environ.get("BMO_ROM_MATCH", 0.6))
+        self.music = music or SongQueue()
+        self.processes = processes or ProcessSupervisor()
         self.persona_prompt = (
             "You are BMO from Adventure Time. You are playful, whimsical, and supportive. "
             "When responding to the user, keep replies concise and in-character while being helpful."
         )
+        self.single_pass_prompt = (
+            f"{self.persona_prompt} You can also control this device with the provided tools. "
+            "Call a tool only when the user asks for one of those actions; otherwise reply directly in character."
+        )
+        self.metrics: Dict[str, int] = {
+            "turns": 0,
+            "llm_calls": 0,
+            "tool_turns": 0,
+            "round_trips_saved": 0,
+            "single_pass_fallbacks": 0,
+            "fast_path_hits": 0,
+        }
+        self._model_stats: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+        if intent_index is None and os.environ.get("BMO_FAST_PATH", "1") != "0":
+            intent_index = build_default_index()
+        self.intent_index = intent_index
         self.tools = self._build_tools()
         self.tool_handlers = {
             "launch_retroarch_game": self.launch_retroarch_game,
             "launch_application": self.launch_application,
             "system_control": self.system_control,
+            "play_music": self.play_music,
+            "queue_song": self.queue_song,
+            "skip_song": self.skip_song,
+            "shuffle_music": self.shuffle_music,
+            "stop_music": self.stop_music,
         }
 
     def _build_tools(self) -> List[Dict]:
@@ -40,21 +127,23 @@ class CommandRouter:
                 "function": {
                     "name": "launch_retroarch_game",
                     "description": (
-                        "Launch a ROM in RetroArch. Use this when the user asks to play a specific game or platform."
+                        "Launch a game from BMO's ROM library in RetroArch. Use this when the user asks to play "
+                        "a specific video game."
                     ),
                     "parameters": {
                         "type": "object",
                         "properties": {
-                            "rom_path": {
+                            "title": {
                                 "type": "string",
-                                "description": "Absolute path to the ROM file requested by the user.",
+                                "description": "Title of the game as the user said it, e.g. 'mario kart'.",
                             },
-                            "core_path": {
+                            "platform": {
                                 "type": "string",
-                                "description": "Optional: path to a specific RetroArch core to load before the ROM.",
+                                "enum": sorted(PLATFORM_ALIASES),
+                                "description": "Optional: console the user asked for.",
                             },
                         },
-                        "required": ["rom_path"],
+                        "required": ["title"],
                     },
                 },
             },
@@ -93,31 +182,395 @@ class CommandRouter:
                     },
                 },
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "play_music",
+                    "description": "Play a song from BMO's music library, or the whole library if no song is named.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "song": {"type": "string", "description": "Optional: title of the song to play."},
+                            "shuffle": {"type": "boolean", "description": "Optional: play the library shuffled."},
+                        },
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "queue_song",
+                    "description": "Add a song to play after the current one.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {"song": {"type": "string", "description": "Title of the song to add."}},
+                        "required": ["song"],
+                    },
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "skip_song",
+                    "description": "Skip to the next song.",
+                    "parameters": {"type": "object", "properties": {}},
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "shuffle_music",
+                    "description": "Shuffle the songs still to come.",
+                    "parameters": {"type": "object", "properties": {}},
+                },
+            },
+            {
+                "type": "function",
+                "function": {
+                    "name": "stop_music",
+                    "description": "Stop the music and clear the song queue.",
+                    "parameters": {"type": "object", "properties": {}},
+                },
+            },
         ]
 
-    def route_command(self, user_input: str) -> RoutedResult:
-        """Send user input to Ollama and act on any tool calls returned."""
+    def route_command(self, user_input: str, on_text: Optional[Callable[[str], None]] = None) -> RoutedResult:
+        """Send user input to Ollama and act on any tool calls returned.
+
+        When ``on_text`` is given the reply is streamed and ``on_text`` is
+        called with each piece of text as soon as it is generated. Utterances
+        matched by the local intent index never reach Ollama; canned replies
+        come back as ``audio_path`` with empty ``content``.
+        """
+
+        if on_text is not None:
+            result = RoutedResult(content="")
+            pieces: List[str] = []
+            for delta in self._route_stream(user_input, result):
+                pieces.append(delta)
+                on_text(delta)
+            result.content = "".join(pieces)
+            return result
 
         try:
-            chat_response = self._call_ollama_with_tools(user_input)
-            message = chat_response.get("message", {})
-            tool_calls = message.get("tool_calls") or []
-
-            if tool_calls:
-                results: List[str] = []
-                for call in tool_calls:
-                    result_text = self._execute_tool(call)
-                    results.append(result_text)
-                return RoutedResult(content="\n".join(results), used_tool=tool_calls[0].get("function", {}).get("name"))
-
-            persona_text = self._persona_completion(user_input)
-            return RoutedResult(content=persona_text)
+            self._count("turns")
+            fast = self.fast_path(user_input)
+            if fast is not None:
+                return fast
+            if self.routing_mode == SINGLE_PASS:
+                routed = self._route_single_pass(user_input)
+            else:
+                routed = self._route_two_pass(user_input)
+            self.memory.add_exchange(user_input, routed.content)
+            return routed
         except Exception as exc:  # pragma: no cover - defensive fallback
             return RoutedResult(content=f"I ran into a glitch handling that: {exc}")
 
-    def _call_ollama_with_tools(self, user_input: str) -> Dict:
-        payload = {
-            "model": self.model,
+    def fast_path(self, user_input: str) -> Optional[RoutedResult]:
+        """Answer ``user_input`` from the local intent index, or return None."""
+
+        if self.intent_index is None:
+            return None
+        match = self.intent_index.match(user_input)
+        if match is None:
+            return self._play_fast_path(user_input)
+        self._count("fast_path_hits")
+        intent = match.intent
+        if intent.tool:
+            handler = self.tool_handlers[intent.tool]
+            return RoutedResult(content=handler(**intent.arguments), used_tool=intent.tool)
+        return RoutedResult(content="", audio_path=random.choice(intent.clips))
+
+    def _play_fast_path(self, user_input: str) -> Optional[RoutedResult]:
+        """Play a song or launch a game named after "play" without asking the LLM."""
+
+        words = normalize(user_input).split()
+        if len(words) > 1 and words[0] == "play":
+            track = self.music.find(" ".join(words[1:]), threshold=0.8)
+            if track is not None:
+                self._count("fast_path_hits")
+                return RoutedResult(content=self.play_music(song=track.title), used_tool="play_music")
+        rom = self.rom_library.match_command(user_input)
+        if rom is None:
+            return None
+        self._count("fast_path_hits")
+        return RoutedResult(content=self._launch_rom(rom.rom), used_tool="launch_retroarch_game")
+
+    def can_answer_early(self, partial_text: str) -> bool:
+        """Whether a partial transcript already matches a canned reply.
+
+        Only chat intents qualify; tool intents wait for the final transcript
+        so a pause mid-sentence can't trigger a shutdown.
+        """
+
+        if self.intent_index is None:
+            return False
+        match = self.intent_index.match(partial_text)
+        return match is not None and not match.intent.tool
+
+    def warm_up(self) -> Dict[str, float]:
+        """Load the models into Ollama memory and open a pooled connection.
+
+        Two empty generate requests are timed per model: the first pays
+        connection setup and model load, the second shows what a warm request
+        costs. With tiered models both are loaded so neither stage waits on a
+        swap (Ollama must allow two resident models, see
+        ``OLLAMA_MAX_LOADED_MODELS``). The ROM library is rescanned
+        alongside.
+        """
+
+        timings: Dict[str, float] = {}
+        scan: Dict[str, float] = {}
+        scanner = threading.Thread(target=lambda: scan.update(self.rom_library.refresh()), daemon=True)
+        scanner.start()
+        tiered = self.tool_model != self.persona_model
+        for stage, model in (("persona", self.persona_model), ("tool", self.tool_model)):
+            if not tiered and stage == "tool":
+                break
+            prefix = f"{stage}_" if tiered else ""
+            for label in ("cold", "warm"):
+                started = time.perf_counter()
+                response = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json={"model": model, "prompt": "", "keep_alive": self.keep_alive},
+                    timeout=120,
+                )
+                response.raise_for_status()
+                timings[f"{prefix}{label}_ms"] = (time.perf_counter() - started) * 1000
+                timings[f"{prefix}{label}_model_load_ms"] = response.json().get("load_duration", 0) / 1e6
+        scanner.join()
+        if scan:
+            timings["roms"] = scan["roms"]
+            timings["rom_scan_ms"] = scan["scan_ms"]
+        return timings
+
+    def routing_metrics(self) -> Dict[str, int]:
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+    def model_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-model call counts with mean latency, time to first token and generation speed.
+
+        Prompt token counts are what Ollama actually evaluated, so a reused
+        prompt prefix shows up as a small count even as the history grows.
+        """
+
+        with self._metrics_lock:
+            stats = {model: dict(values) for model, values in self._model_stats.items()}
+        report: Dict[str, Dict[str, float]] = {}
+        for model, values in stats.items():
+            calls = values["calls"]
+            report[model] = {
+                "calls": calls,
+                "mean_ms": values["total_ms"] / calls,
+                "mean_first_token_ms": values["first_token_ms"] / calls,
+                "tokens_per_second": values["eval_count"] / values["eval_s"] if values["eval_s"] else 0.0,
+                "mean_prompt_tokens": values["prompt_eval_count"] / calls,
+                "last_prompt_tokens": values["last_prompt_eval_count"],
+            }
+        return report
+
+    def _record_model_call(self, model: str, total_ms: float, first_token_ms: float, final: Dict) -> None:
+        with self._metrics_lock:
+            values = self._model_stats.setdefault(
+                model,
+                {
+                    "calls": 0,
+                    "total_ms": 0.0,
+                    "first_token_ms": 0.0,
+                    "eval_count": 0,
+                    "eval_s": 0.0,
+                    "prompt_eval_count": 0,
+                    "last_prompt_eval_count": 0,
+                },
+            )
+            values["calls"] += 1
+            values["total_ms"] += total_ms
+            values["first_token_ms"] += first_token_ms
+            values["eval_count"] += final.get("eval_count", 0)
+            values["eval_s"] += final.get("eval_duration", 0) / 1e9
+            values["prompt_eval_count"] += final.get("prompt_eval_count", 0)
+            values["last_prompt_eval_count"] = final.get("prompt_eval_count", 0)
+
+    def _route_single_pass(self, user_input: str) -> RoutedResult:
+        message = self._post_chat(self._single_pass_payload(user_input), "ollama_single_pass").get("message", {})
+        tool_calls = message.get("tool_calls") or []
+        if tool_calls:
+            return self._run_tools(tool_calls)
+
+        content = (message.get("content") or "").strip()
+        if content:
+            self._count("round_trips_saved")
+            return RoutedResult(content=content)
+
+        self._count("single_pass_fallbacks")
+        return RoutedResult(content=self._persona_completion(user_input))
+
+    def _route_two_pass(self, user_input: str) -> RoutedResult:
+        chat_response = self._call_ollama_with_tools(user_input)
+        message = chat_response.get("message", {})
+        tool_calls = message.get("tool_calls") or []
+
+        if tool_calls:
+            return self._run_tools(tool_calls)
+
+        persona_text = self._persona_completion(user_input)
+        return RoutedResult(content=persona_text)
+
+    def _run_tools(self, tool_calls: List[Dict]) -> RoutedResult:
+        self._count("tool_turns")
+        results: List[str] = []
+        for call in tool_calls:
+            with tracer.span("tool", name=call.get("function", {}).get("name")):
+                result_text = self._execute_tool(call)
+            results.append(result_text)
+        return RoutedResult(content="\n".join(results), used_tool=tool_calls[0].get("function", {}).get("name"))
+
+    def _count(self, name: str) -> None:
+        with self._metrics_lock:
+            self.metrics[name] += 1
+
+    def stream_command(self, user_input: str) -> Iterator[str]:
+        """Yield the reply to ``user_input`` piece by piece as Ollama generates it.
+
+        Tool calls are still detected and executed; their result text is
+        yielded once the tool has run. Canned-clip matches yield nothing; use
+        ``route_command`` with ``on_text`` to receive their ``audio_path``.
+        """
+
+        return self._route_stream(user_input, RoutedResult(content=""))
+
+    def _route_stream(self, user_input: str, result: RoutedResult) -> Generator[str, None, None]:
+        try:
+            self._count("turns")
+            fast = self.fast_path(user_input)
+            if fast is not None:
+                result.used_tool = fast.used_tool
+                result.audio_path = fast.audio_path
+                if fast.content:
+                    yield fast.content
+                return
+            pieces: List[str] = []
+            for delta in self._stream_llm(user_input, result):
+                pieces.append(delta)
+                yield delta
+            self.memory.add_exchange(user_input, "".join(pieces))
+        except Exception as exc:  # pragma: no cover - defensive fallback
+            yield f"I ran into a glitch handling that: {exc}"
+
+    def _stream_llm(self, user_input: str, result: RoutedResult) -> Generator[str, None, None]:
+        if self.routing_mode == SINGLE_PASS:
+            # Leading whitespace is held back: only visible text commits the turn to a spoken
+            # reply. Once it has, a late tool call still runs but its result isn't spoken too.
+            tool_calls: List[Dict] = []
+            produced = False
+            for chunk in self._stream_chat(self._single_pass_payload(user_input), "ollama_single_pass"):
+                message = chunk.get("message", {})
+                tool_calls.extend(message.get("tool_calls") or [])
+                delta = message.get("content")
+                if delta and (produced or (not tool_calls and delta.strip())):
+                    produced = True
+                    yield delta
+            if produced:
+                if tool_calls:
+                    routed = self._run_tools(tool_calls)
+                    result.used_tool = routed.used_tool
+                    print(f"Tool result after a spoken reply: {routed.content}")
+                else:
+                    self._count("round_trips_saved")
+                return
+            if not tool_calls:
+                self._count("single_pass_fallbacks")
+        else:
+            tool_calls = self._stream_tool_decision(user_input)
+
+        if tool_calls:
+            routed = self._run_tools(tool_calls)
+            result.used_tool = routed.used_tool
+            yield routed.content
+            return
+
+        yield from self._stream_persona(user_input)
+
+    def _stream_persona(self, user_input: str) -> Generator[str, None, None]:
+        produced = False
+        for chunk in self._stream_chat(self._persona_payload(user_input), "ollama_persona"):
+            delta = chunk.get("message", {}).get("content")
+            if delta:
+                produced = True
+                yield delta
+        if not produced:
+            yield "BMO is thinking but stayed quiet."
+
+    def _stream_tool_decision(self, user_input: str) -> List[Dict]:
+        """Return tool calls from a streamed routing request.
+
+        The stream is abandoned as soon as the model starts answering in plain
+        text, since that means no tool will be called.
+        """
+
+        tool_calls: List[Dict] = []
+        for chunk in self._stream_chat(self._tool_payload(user_input), "ollama_tools"):
+            message = chunk.get("message", {})
+            tool_calls.extend(message.get("tool_calls") or [])
+            if not tool_calls and (message.get("content") or "").strip():
+                break
+        return tool_calls
+
+    def _stream_chat(self, payload: Dict, stage: str) -> Generator[Dict, None, None]:
+        self._count("llm_calls")
+        started = time.time()
+        first_chunk: Optional[float] = None
+        final: Dict = {}
+        response = self.session.post(
+            f"{self.base_url}/api/chat", json=dict(payload, stream=True), timeout=30, stream=True
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if first_chunk is None:
+                    first_chunk = time.time()
+                if chunk.get("done"):
+                    final = chunk
+                yield chunk
+                if chunk.get("done"):
+                    break
+        finally:
+            response.close()
+            first_chunk_ms = round(((first_chunk or time.time()) - started) * 1000, 1)
+            model = payload["model"]
+            tracer.record(
+                stage,
+                started,
+                first_chunk_ms=first_chunk_ms,
+                stream=True,
+                model=model,
+                prompt_tokens=final.get("prompt_eval_count"),
+            )
+            self._record_model_call(model, (time.time() - started) * 1000, first_chunk_ms, final)
+
+    def _single_pass_payload(self, user_input: str) -> Dict:
+        return {
+            "model": self.persona_model,
+            "messages": [
+                {"role": "system", "content": self.single_pass_prompt},
+                *self.memory.messages(),
+                {"role": "user", "content": user_input},
+            ],
+            "tools": self.tools,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": self.persona_options,
+        }
+
+    def _tool_payload(self, user_input: str) -> Dict:
+        return {
+            "model": self.tool_model,
             "messages": [
                 {
                     "role": "system",
@@ -127,23 +580,42 @@ class CommandRouter:
             ],
             "tools": self.tools,
             "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": self.tool_options,
         }
-        response = requests.post(f"{self.base_url}/api/chat", json=payload, timeout=30)
-        response.raise_for_status()
-        return response.json()
 
-    def _persona_completion(self, user_input: str) -> str:
-        payload = {
-            "model": self.model,
+    def _persona_payload(self, user_input: str) -> Dict:
+        return {
+            "model": self.persona_model,
             "messages": [
                 {"role": "system", "content": self.persona_prompt},
+                *self.memory.messages(),
                 {"role": "user", "content": user_input},
             ],
             "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": self.persona_options,
         }
-        response = requests.post(f"{self.base_url}/api/chat", json=payload, timeout=30)
-        response.raise_for_status()
-        content = response.json().get("message", {}).get("content")
+
+    def _post_chat(self, payload: Dict, stage: str) -> Dict:
+        self._count("llm_calls")
+        started = time.time()
+        body: Dict = {}
+        try:
+            response = self.session.post(f"{self.base_url}/api/chat", json=payload, timeout=30)
+            response.raise_for_status()
+            body = response.json()
+        finally:
+            tracer.record(stage, started, model=payload["model"], prompt_tokens=body.get("prompt_eval_count"))
+        elapsed_ms = (time.time() - started) * 1000
+        self._record_model_call(payload["model"], elapsed_ms, elapsed_ms, body)
+        return body
+
+    def _call_ollama_with_tools(self, user_input: str) -> Dict:
+        return self._post_chat(self._tool_payload(user_input), "ollama_tools")
+
+    def _persona_completion(self, user_input: str) -> str:
+        content = self._post_chat(self._persona_payload(user_input), "ollama_persona").get("message", {}).get("content")
         return content or "BMO is thinking but stayed quiet."
 
     def _execute_tool(self, tool_call: Dict) -> str:
@@ -161,27 +633,81 @@ class CommandRouter:
 
         return handler(**arguments)
 
-    def launch_retroarch_game(self, rom_path: str, core_path: Optional[str] = None) -> str:
+    def launch_retroarch_game(self, title: str, platform: Optional[str] = None) -> str:
+        matches = self.rom_library.search(title, platform)
+        if not matches or matches[0].score < self.rom_match_threshold:
+            if matches:
+                return f"BMO couldn't find {title}. Did you mean {matches[0].rom.title}?"
+            return f"BMO couldn't find a game called {title}."
+        return self._launch_rom(matches[0].rom)
+
+    def _launch_rom(self, rom: RomEntry) -> str:
         command = ["retroarch"]
-        if core_path:
-            command.extend(["-L", core_path])
-        command.append(rom_path)
-        subprocess.Popen(command)
-        return f"Launching RetroArch with {os.path.basename(rom_path)}."
+        if rom.core:
+            command.extend(["-L", rom.core])
+        command.append(rom.path)
+        self.processes.launch("retroarch", command, kind=GAME)
+        return f"Launching {rom.title}."
 
     def launch_application(self, command: str) -> str:
         args = shlex.split(command)
-        subprocess.Popen(args)
+        if not args:
+            return "BMO needs to know which application to launch."
+        name = os.path.basename(args[0])
+        if any(process.name == name for process in self.processes.running()):
+            return f"{name} is already running."
+        self.processes.launch(name, args)
         return f"Launching application: {command}."
 
     def system_control(self, action: str) -> str:
         if action == "shutdown":
-            subprocess.Popen(["sudo", "shutdown", "now"])
+            self.processes.launch(action, ["sudo", "shutdown", "now"], kind=SYSTEM)
             return "Shutting down now."
         if action == "reboot":
-            subprocess.Popen(["sudo", "reboot"])
+            self.processes.launch(action, ["sudo", "reboot"], kind=SYSTEM)
             return "Rebooting now."
         if action == "sleep":
-            subprocess.Popen(["systemctl", "suspend"])
+            self.processes.launch(action, ["systemctl", "suspend"], kind=SYSTEM)
             return "Going to sleep."
         return f"Unknown system action: {action}."
+
+    def play_music(self, song: Optional[str] = None, shuffle: bool = False) -> str:
+        library = self.music.library()
+        if not library:
+            return "BMO doesn't have any songs yet."
+        if song:
+            track = self.music.find(song)
+            if track is None:
+                return f"BMO couldn't find a song called {song}."
+            start = next(index for index, candidate in enumerate(library) if candidate.path == track.path)
+            library = library[start:] + library[:start]
+        elif shuffle:
+            random.shuffle(library)
+        self.music.play(library)
+        return f"Playing {library[0].title}."
+
+    def queue_song(self, song: str) -> str:
+        track = self.music.find(song)
+        if track is None:
+            return f"BMO couldn't find a song called {song}."
+        if not self.music.playing:
+            self.music.play([track])
+            return f"Playing {track.title}."
+        self.music.enqueue(track)
+        return f"{track.title} is next in the queue."
+
+    def skip_song(self) -> str:
+        if not self.music.playing:
+            return "No music is playing."
+        upcoming = self.music.skip()
+        return f"Skipping to {upcoming.title}." if upcoming else "That was the last song."
+
+    def shuffle_music(self) -> str:
+        if not self.music.playing:
+            return self.play_music(shuffle=True)
+        self.music.shuffle()
+        return "Shuffling the songs."
+
+    def stop_music(self) -> str:
+        self.music.stop()
+        return "Stopping the music."
@@ -0,0 +1,85 @@
+"""Rolling conversation history for the Ollama persona, bounded by a token budget."""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+
+    return len(text) // 4 + 1
+
+
+class ConversationMemory:
+    """Recent user/assistant exchanges, oldest first.
+
+    Exchanges are dropped oldest-first once the history exceeds
+    ``token_budget``. Trimming goes down to ``trim_to`` of the budget rather
+    than just under it, so the history (which sits right after the system
+    prompt) keeps the same prefix for several turns and Ollama can reuse its
+    evaluated prompt cache instead of re-reading the conversation every turn.
+    The history is forgotten after ``idle_seconds`` without a turn.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        trim_to: float = 0.5,
+        idle_seconds: Optional[float] = None,
+    ) -> None:
+        self.token_budget = token_budget if token_budget is not None else int(
+            os.environ.get("BMO_HISTORY_TOKENS", 1024)
+        )
+        self.trim_to = trim_to
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(
+            os.environ.get("BMO_HISTORY_IDLE_S", 600)
+        )
+        self._exchanges: List[List[Dict[str, str]]] = []
+        self._tokens = 0
+        self._last_turn = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        with self._lock:
+            return self._tokens
+
+    def messages(self) -> List[Dict[str, str]]:
+        """The history as chat messages, ready to go between the system prompt and the new user turn."""
+
+        with self._lock:
+            self._expire()
+            return [dict(message) for exchange in self._exchanges for message in exchange]
+
+    def add_exchange(self, user_text: str, reply_text: str) -> None:
+        if self.token_budget <= 0 or not reply_text.strip():
+            return
+        exchange = [
+            {"role": "user", "content": user_text},
+            {"role": "assistant", "content": reply_text.strip()},
+        ]
+        with self._lock:
+            self._expire()
+            self._exchanges.append(exchange)
+            self._tokens += self._exchange_tokens(exchange)
+            self._last_turn = time.time()
+            if self._tokens > self.token_budget:
+                target = self.token_budget * self.trim_to
+                while self._exchanges and self._tokens > target:
+                    self._tokens -= self._exchange_tokens(self._exchanges.pop(0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exchanges.clear()
+            self._tokens = 0
+
+    def _expire(self) -> None:
+        if self._exchanges and self.idle_seconds and time.time() - self._last_turn > self.idle_seconds:
+            self._exchanges.clear()
+            self._tokens = 0
+
+    @staticmethod
+    def _exchange_tokens(exchange: List[Dict[str, str]]) -> int:
+        return sum(estimate_tokens(message["content"]) + 4 for message in exchange)
@@ -0,0 +1,124 @@
+"""Energy-based voice activity endpointing for captured microphone frames."""
+
+import json
+import os
+from typing import Optional, Sequence
+
+import numpy as np
+
+SILENCE = "silence"
+SPEECH = "speech"
+END = "end"
+NO_SPEECH = "no_speech"
+
+
+class Endpointer:
+    """Decide when an utterance has ended from per-frame energy.
+
+    A frame counts as speech when its RMS exceeds the tracked noise floor by
+    ``speech_ratio``. The utterance ends after ``silence_ms`` of quiet that
+    follows at least ``min_speech_ms`` of speech, or at ``max_utterance_ms``.
+    The noise floor adapts on quiet frames, carries over between turns and
+    is saved to ``state_path`` so it survives restarts.
+    """
+
+    def __init__(
+        self,
+        frame_length: int,
+        sample_rate: int = 16000,
+        silence_ms: Optional[int] = None,
+        max_utterance_ms: Optional[int] = None,
+        no_speech_ms: Optional[int] = None,
+        min_speech_ms: Optional[int] = None,
+        speech_ratio: Optional[float] = None,
+        state_path: Optional[str] = None,
+    ) -> None:
+        self.frame_ms = frame_length / sample_rate * 1000
+        self.silence_ms = silence_ms if silence_ms is not None else int(os.environ.get("BMO_VAD_SILENCE_MS", 500))
+        self.max_utterance_ms = max_utterance_ms if max_utterance_ms is not None else int(
+            os.environ.get("BMO_VAD_MAX_UTTERANCE_MS", 10000)
+        )
+        self.no_speech_ms = no_speech_ms if no_speech_ms is not None else int(os.environ.get("BMO_VAD_NO_SPEECH_MS", 5000))
+        self.min_speech_ms = min_speech_ms if min_speech_ms is not None else int(
+            os.environ.get("BMO_VAD_MIN_SPEECH_MS", 150)
+        )
+        self.speech_ratio = speech_ratio if speech_ratio is not None else float(os.environ.get("BMO_VAD_SPEECH_RATIO", 3.0))
+        self.min_threshold = 100.0
+        self.state_path = state_path or os.environ.get("BMO_VAD_STATE_PATH") or os.path.join(
+            os.path.expanduser("~"), ".cache", "bmo", "vad.json"
+        )
+        self.noise_floor = self._load_noise_floor()
+        self.reset()
+
+    @property
+    def threshold(self) -> float:
+        return max(self.noise_floor * self.speech_ratio, self.min_threshold)
+
+    @property
+    def speech_detected(self) -> bool:
+        return self._speech_ms >= self.min_speech_ms
+
+    @property
+    def speech_ms(self) -> float:
+        return self._speech_ms
+
+    def reset(self) -> None:
+        """Forget the current utterance while keeping the learned noise floor."""
+
+        self._elapsed_ms = 0.0
+        self._speech_ms = 0.0
+        self._quiet_ms = 0.0
+
+    def process(self, frame: Sequence[int]) -> str:
+        """Classify one frame and return ``speech``, ``silence``, ``end`` or ``no_speech``."""
+
+        rms = frame_rms(frame)
+        self._elapsed_ms += self.frame_ms
+        if rms >= self.threshold:
+            self._speech_ms += self.frame_ms
+            self._quiet_ms = 0.0
+            state = SPEECH
+        else:
+            self._quiet_ms += self.frame_ms
+            self._track_noise(rms)
+            state = SILENCE
+
+        if self.speech_detected and self._quiet_ms >= self.silence_ms:
+            return END
+        if self._elapsed_ms >= self.max_utterance_ms:
+            return END if self.speech_detected else NO_SPEECH
+        if not self.speech_detected and self._elapsed_ms >= self.no_speech_ms:
+            return NO_SPEECH
+        return state
+
+    def observe(self, frame: Sequence[int]) -> None:
+        """Update the noise floor from a frame heard while no command is being recorded."""
+
+        rms = frame_rms(frame)
+        if rms < self.threshold:
+            self._track_noise(rms)
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path, "w", encoding="utf-8") as handle:
+                json.dump({"noise_floor": self.noise_floor}, handle)
+        except OSError:
+            pass
+
+    def _track_noise(self, rms: float) -> None:
+        # Fall quickly towards quieter rooms, rise slowly so speech tails don't inflate it.
+        rate = 0.2 if rms < self.noise_floor else 0.02
+        self.noise_floor = max(self.noise_floor + (rms - self.noise_floor) * rate, 1.0)
+
+    def _load_noise_floor(self) -> float:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as handle:
+                return float(json.load(handle).get("noise_floor", 200.0))
+        except (OSError, ValueError, AttributeError):
+            return 200.0
+
+
+def frame_rms(frame: Sequence[int]) -> float:
+    samples = np.asarray(frame, dtype=np.float32)
+    return float(np.sqrt(np.mean(np.square(samples)))) if samples.size else 0.0
@@ -0,0 +1,82 @@
+"""In-memory cache of decoded face textures so swaps never touch the SD card."""
+
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from kivy.core.image import Image as CoreImage
+
+
+class FaceTextureCache:
+    """Decode face images once and hand out the GPU textures on demand.
+
+    Faces passed to :meth:`preload` stay resident for the life of the app.
+    Other images (e.g. song pictures) are loaded on first use and kept in an
+    LRU that is trimmed whenever the total would exceed ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.environ.get("BMO_FACE_CACHE_MB", 64)) * 1024 * 1024
+        )
+        self._pinned = {}
+        self._recent: "OrderedDict[str, object]" = OrderedDict()
+        self.pinned_bytes = 0
+        self.recent_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self.pinned_bytes + self.recent_bytes
+
+    def preload(self, paths: Iterable[str]) -> None:
+        for path in paths:
+            if path in self._pinned:
+                continue
+            texture = self._decode(path)
+            if texture is None:
+                continue
+            self._pinned[path] = texture
+            self.pinned_bytes += self._texture_bytes(texture)
+
+    def get(self, path: Optional[str]):
+        """Return the texture for ``path``, decoding and caching it if needed."""
+
+        if not path:
+            return None
+        texture = self._pinned.get(path)
+        if texture is not None:
+            return texture
+        texture = self._recent.get(path)
+        if texture is not None:
+            self._recent.move_to_end(path)
+            return texture
+
+        texture = self._decode(path)
+        if texture is None:
+            return None
+        self._recent[path] = texture
+        self.recent_bytes += self._texture_bytes(texture)
+        while len(self._recent) > 1 and self.total_bytes > self.max_bytes:
+            _, evicted = self._recent.popitem(last=False)
+            self.recent_bytes -= self._texture_bytes(evicted)
+        return texture
+
+    def describe(self) -> str:
+        return (
+            f"{len(self._pinned)} faces preloaded ({self.pinned_bytes / 1048576:.1f} MB), "
+            f"{len(self._recent)} other images cached ({self.recent_bytes / 1048576:.1f} MB), "
+            f"limit {self.max_bytes / 1048576:.0f} MB"
+        )
+
+    @staticmethod
+    def _decode(path: str):
+        try:
+            return CoreImage(path).texture
+        except Exception as exc:  # pragma: no cover - bad or missing image file
+            print(f"Could not load face image {path}: {exc}")
+            return None
+
+    @staticmethod
+    def _texture_bytes(texture) -> int:
+        width, height = texture.size
+        return width * height * 4
@@ -2,16 +2,24 @@
 
 import os
 import tempfile
+import threading
 import time
-from typing import Generator, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Dict, Generator, List, Optional
 
 import requests
 
+from http_pool import create_session
+from sentences import split_sentences
+from tts_cache import TTSClipCache
+from turn_trace import tracer
+
 
 class FishAudioClient:
     """Client wrapper for Fish Audio TTS endpoints.
 
-    The client exchanges GPT-style text for synthesized audio clips.
+    The client exchanges GPT-style text for synthesized audio clips. Clips are
+    kept in a :class:`TTSClipCache` so repeated phrases skip the network.
     """
 
     def __init__(
@@ -22,38 +30,189 @@ class FishAudioClient:
         speaker_id: Optional[str] = None,
         timeout: int = 30,
         retries: int = 3,
+        cache: Optional[TTSClipCache] = None,
+        audio_format: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        session: Optional[requests.Session] = None,
     ) -> None:
         self.api_key = api_key or os.environ.get("FISH_AUDIO_API_KEY")
         self.base_url = (base_url or os.environ.get("FISH_AUDIO_BASE_URL") or "https://api.fish.audio/v1").rstrip("/")
         self.model = model or os.environ.get("FISH_AUDIO_MODEL", "gpt_sovits")
         self.speaker_id = speaker_id or os.environ.get("FISH_AUDIO_SPEAKER_ID")
+        self.audio_format = audio_format or os.environ.get("FISH_AUDIO_FORMAT")
         self.timeout = timeout
         self.retries = retries
+        if cache is None and os.environ.get("FISH_AUDIO_CACHE", "1") != "0":
+            cache = TTSClipCache()
+        self.cache = cache
+        self.max_workers = max_workers or int(os.environ.get("FISH_AUDIO_MAX_WORKERS", 2))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._temp_paths = set()
+        self._temp_paths_lock = threading.Lock()  # added from pool threads, released from the UI thread
+        self.session = session or create_session(int(os.environ.get("FISH_AUDIO_POOL_SIZE", self.max_workers)))
 
     def synthesize_to_path(self, text: str) -> str:
         """Return a local audio file path for the synthesized text.
 
-        A temporary file is written so existing audio playback utilities can
-        operate on a path. Callers are responsible for deleting the returned
-        file when done.
+        With the clip cache enabled the path points into the cache and must
+        not be deleted; otherwise a temporary file is written. Either way,
+        hand the path to :meth:`release_path` when playback is done.
+        """
+
+        if self.cache is not None:
+            return self.cache.get_or_create(
+                self._cache_key(text), lambda handle: self._download(text, handle), pin=True
+            )
+
+        fd, path = tempfile.mkstemp(suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                suffix = self._download(text, handle)
+        except BaseException:
+            os.remove(path)
+            raise
+        final_path = os.path.splitext(path)[0] + (suffix or ".wav")
+        os.replace(path, final_path)
+        with self._temp_paths_lock:
+            self._temp_paths.add(final_path)
+        return final_path
+
+    def submit(self, text: str) -> "Future[str]":
+        """Queue ``text`` for synthesis on the bounded worker pool."""
+
+        return self._pool().submit(tracer.wrap(self.synthesize_to_path), text)
+
+    def synthesize_sentences(self, text: str) -> List["Future[str]"]:
+        """Split ``text`` into sentences and synthesize them concurrently.
+
+        The futures are returned in speaking order; at most ``max_workers``
+        requests are in flight at once, so the first sentence is ready long
+        before the last one finishes.
+        """
+
+        return [self.submit(sentence) for sentence in split_sentences(text)]
+
+    def warm_up(self) -> Dict[str, float]:
+        """Open a pooled connection to the TTS host ahead of the first request.
+
+        The first request pays DNS, TCP and TLS setup; the second reuses the
+        kept-alive connection, so the difference is the handshake cost saved.
         """
 
+        timings: Dict[str, float] = {}
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            self.session.head(self.base_url, timeout=self.timeout).close()
+            timings[f"{label}_ms"] = (time.perf_counter() - started) * 1000
+        return timings
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        self.session.close()
+
+    def release_path(self, path: str) -> None:
+        """Dispose of a path returned by :meth:`synthesize_to_path`.
+
+        Cached clips are left in place but become evictable again; temporary
+        files are removed and paths the client did not create are ignored.
+        """
+
+        if self.cache is not None and self.cache.owns(path):
+            self.cache.release(path)
+            return
+        with self._temp_paths_lock:
+            if path not in self._temp_paths:
+                return
+            self._temp_paths.discard(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def owns_path(self, path: str) -> bool:
+        """Return True for clips created by this client (cached or temporary)."""
+
+        with self._temp_paths_lock:
+            if path in self._temp_paths:
+                return True
+        return self.cache is not None and self.cache.owns(path)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self.cache.stats() if self.cache is not None else {}
+
+    def synthesize_stream(self, text: str) -> Generator[bytes, None, None]:
+        """Stream raw audio bytes for the provided text.
+
+        Cached clips are read back from disk. Otherwise the downloaded bytes
+        are also written to the cache, which keeps the clip only if the stream
+        was read to the end.
+        """
+
+        if self.cache is None:
+            started = time.time()
+            response = self._post_tts(text, stream=True)
+            yield from self._iter_chunks(response, text, started)
+            return
+
+        key = self._cache_key(text)
+        cached = self.cache.lookup(key)
+        if cached:
+            with open(cached, "rb") as handle:
+                yield from iter(lambda: handle.read(8192), b"")
+            return
+
+        self.cache.record_miss()
+        started = time.time()
         response = self._post_tts(text, stream=True)
         suffix = self._infer_extension(response.headers.get("Content-Type"))
-        fd, path = tempfile.mkstemp(suffix=suffix or ".wav")
-        with os.fdopen(fd, "wb") as handle:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
+        fd, temp_path = self.cache.new_temp_file()
+        completed = False
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in self._iter_chunks(response, text, started):
                     handle.write(chunk)
-        return path
+                    yield chunk
+            completed = True
+        finally:
+            if completed:
+                self.cache.store(key, temp_path, suffix)
+            elif os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fish-tts")
+            return self._executor
+
+    def _cache_key(self, text: str) -> str:
+        return self.cache.make_key(text, self.model, self.speaker_id, self.audio_format)
+
+    def _download(self, text: str, handle: BinaryIO) -> Optional[str]:
+        started = time.time()
+        response = self._post_tts(text, stream=True)
+        for chunk in self._iter_chunks(response, text, started):
+            handle.write(chunk)
+        return self._infer_extension(response.headers.get("Content-Type"))
 
-    def synthesize_stream(self, text: str) -> Generator[bytes, None, None]:
-        """Stream raw audio bytes for the provided text."""
+    @staticmethod
+    def _iter_chunks(response: requests.Response, text: str, started: float) -> Generator[bytes, None, None]:
+        """Yield the response body, tracing time to first and last byte of the request."""
 
-        response = self._post_tts(text, stream=True)
-        for chunk in response.iter_content(chunk_size=8192):
-            if chunk:
-                yield chunk
+        first_byte: Optional[float] = None
+        size = 0
+        try:
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    if first_byte is None:
+                        first_byte = time.time()
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            first_byte_ms = round(((first_byte or time.time()) - started) * 1000, 1)
+            tracer.record("tts", started, first_byte_ms=first_byte_ms, bytes=size, chars=len(text))
 
     def _post_tts(self, text: str, stream: bool) -> requests.Response:
         if not self.api_key:
@@ -62,6 +221,8 @@ class FishAudioClient:
         payload = {"text": text, "model": self.model}
         if self.speaker_id:
             payload["speaker_id"] = self.speaker_id
+        if self.audio_format:
+            payload["format"] = self.audio_format
 
         headers = {"Authorization": f"Bearer {self.api_key}"}
         url = f"{self.base_url}/tts"
@@ -69,7 +230,7 @@ class FishAudioClient:
         last_error: Optional[Exception] = None
         for attempt in range(1, self.retries + 1):
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout, stream=stream)
+                response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout, stream=stream)
                 response.raise_for_status()
                 return response
             except Exception as exc:  # pragma: no cover - defensive retry
@@ -0,0 +1,18 @@
+"""Shared keep-alive HTTP sessions for the Ollama and Fish Audio clients."""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """Return a session that keeps up to ``pool_size`` connections per host open.
+
+    Reusing one session lets repeated requests skip the TCP and TLS
+    handshakes that a bare ``requests.post`` pays every time.
+    """
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
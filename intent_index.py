@@ -0,0 +1,180 @@
+"""Precompiled phrase index for answering common utterances without the LLM."""
+
+import glob
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+_FILLER_WORDS = {"hey", "bmo", "beemo", "please", "um", "uh", "ok", "okay", "so", "oh"}
+
+
+@dataclass
+class Intent:
+    """A local intent answered either by a canned clip or by a tool call."""
+
+    name: str
+    phrases: List[str]
+    clips: List[str] = field(default_factory=list)
+    tool: Optional[str] = None
+    arguments: Dict[str, str] = field(default_factory=dict)
+    threshold: float = 0.85
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    phrase: str
+    score: float
+
+
+def normalize(text: str) -> str:
+    words = _NON_WORD.sub(" ", text.lower().replace("’", "'")).split()
+    kept = [word for word in words if word not in _FILLER_WORDS]
+    return " ".join(kept or words)
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IntentIndex:
+    """Match utterances to intents by exact phrase or trigram similarity.
+
+    Phrases are normalized and broken into character trigrams once, with an
+    inverted index from trigram to phrase, so a lookup only scores phrases
+    that share at least one trigram with the utterance. A fuzzy match must
+    also beat the best phrase of any other intent by ``margin``, so an
+    utterance halfway between two intents goes to the LLM instead.
+    """
+
+    def __init__(self, intents: List[Intent], margin: Optional[float] = None) -> None:
+        self.intents = intents
+        self.margin = margin if margin is not None else float(os.environ.get("BMO_INTENT_MARGIN", 0.1))
+        self._exact: Dict[str, int] = {}
+        self._phrases: List[str] = []
+        self._phrase_intents: List[Intent] = []
+        self._phrase_sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for intent in intents:
+            for phrase in intent.phrases:
+                self._add_phrase(intent, normalize(phrase))
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Return the best intent for ``text`` if it clears that intent's threshold."""
+
+        normalized = normalize(text)
+        if not normalized:
+            return None
+        exact = self._exact.get(normalized)
+        if exact is not None:
+            return IntentMatch(self._phrase_intents[exact], self._phrases[exact], 1.0)
+
+        grams = trigrams(normalized)
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for phrase_id in self._postings.get(gram, ()):
+                overlap[phrase_id] += 1
+
+        best_by_intent: Dict[str, IntentMatch] = {}
+        for phrase_id, shared in overlap.items():
+            score = 2.0 * shared / (len(grams) + self._phrase_sizes[phrase_id])
+            intent = self._phrase_intents[phrase_id]
+            current = best_by_intent.get(intent.name)
+            if current is None or score > current.score:
+                best_by_intent[intent.name] = IntentMatch(intent, self._phrases[phrase_id], score)
+        ranked = sorted(best_by_intent.values(), key=lambda match: match.score, reverse=True)
+        if not ranked or ranked[0].score < ranked[0].intent.threshold:
+            return None
+        if len(ranked) > 1 and ranked[0].score - ranked[1].score < self.margin:
+            return None
+        return ranked[0]
+
+    def _add_phrase(self, intent: Intent, phrase: str) -> None:
+        phrase_id = len(self._phrases)
+        grams = trigrams(phrase)
+        self._phrases.append(phrase)
+        self._phrase_intents.append(intent)
+        self._phrase_sizes.append(len(grams))
+        self._exact.setdefault(phrase, phrase_id)
+        for gram in grams:
+            self._postings[gram].append(phrase_id)
+
+
+def build_default_index(responses_dir: str = "./responses") -> IntentIndex:
+    """Build the index for BMO's prerecorded replies and system actions."""
+
+    def clips(prefix: str) -> List[str]:
+        return sorted(
+            path
+            for path in glob.glob(os.path.join(responses_dir, f"{prefix}*"))
+            if path.lower().endswith((".wav", ".mp3", ".ogg"))
+        )
+
+    intents = [
+        Intent(
+            "greeting",
+            ["hello", "hi", "hey", "hi there", "hello there", "good morning", "good afternoon", "howdy"],
+            clips=clips("hello-"),
+        ),
+        Intent(
+            "how_are_you",
+            ["how are you", "how are you doing", "how's it going", "how do you feel", "are you ok"],
+            clips=clips("how-are-you-"),
+        ),
+        Intent(
+            "goodnight",
+            ["goodnight", "good night", "night night", "sweet dreams"],
+            clips=clips("goodnight"),
+        ),
+        Intent(
+            "shutdown",
+            # Only phrases addressed to BMO ("bmo" itself is dropped as filler): a bare "shut down" is too easy to mishear.
+            ["turn yourself off", "shut yourself down", "power yourself off"],
+            tool="system_control",
+            arguments={"action": "shutdown"},
+            threshold=0.9,
+        ),
+        Intent(
+            "reboot",
+            ["reboot yourself", "restart yourself"],
+            tool="system_control",
+            arguments={"action": "reboot"},
+            threshold=0.9,
+        ),
+        Intent(
+            "sleep",
+            ["put yourself to sleep", "suspend yourself"],
+            tool="system_control",
+            arguments={"action": "sleep"},
+            threshold=0.9,
+        ),
+        Intent(
+            "play_music",
+            ["play music", "play some music", "play a song", "play me a song", "sing me a song"],
+            tool="play_music",
+            threshold=0.85,
+        ),
+        Intent(
+            "skip_song",
+            ["skip", "skip song", "skip this song", "next song", "play the next song"],
+            tool="skip_song",
+            threshold=0.85,
+        ),
+        Intent(
+            "shuffle_music",
+            ["shuffle", "shuffle songs", "shuffle the music", "shuffle my music"],
+            tool="shuffle_music",
+            threshold=0.85,
+        ),
+        Intent(
+            "stop_music",
+            ["stop music", "stop the music", "stop the song", "stop playing music"],
+            tool="stop_music",
+            threshold=0.85,
+        ),
+    ]
+    return IntentIndex([intent for intent in intents if intent.clips or intent.tool])
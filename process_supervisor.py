@@ -0,0 +1,221 @@
+"""Track, limit and reap the programs BMO launches for tool calls."""
+
+import os
+import resource
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # pragma: no cover - non-Linux
+    _CLOCK_TICKS, _PAGE_SIZE = 100, 4096
+
+GAME = "game"
+APP = "app"
+SYSTEM = "system"
+
+# Listener events: "start" and "exit", with the process they concern.
+ProcessListener = Callable[[str, "ManagedProcess"], None]
+
+
+def read_proc_usage(pid: int) -> Optional[Dict[str, float]]:
+    """CPU seconds used so far and resident memory of ``pid`` from ``/proc``, or None."""
+
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as handle:
+            fields = handle.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    # Fields after the command name start at index 3 (state); utime/stime are 14/15, rss is 24.
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    rss_bytes = int(fields[21]) * _PAGE_SIZE
+    return {"cpu_seconds": cpu_seconds, "rss_mb": rss_bytes / 1048576}
+
+
+def _default_max_rss_mb() -> float:
+    try:
+        return 0.75 * os.sysconf("SC_PHYS_PAGES") * _PAGE_SIZE / 1048576
+    except (AttributeError, ValueError, OSError):  # pragma: no cover - non-Linux
+        return 0.0
+
+
+class ManagedProcess:
+    """A launched child with usage samples taken while it runs."""
+
+    def __init__(self, name: str, kind: str, command: List[str], popen: subprocess.Popen) -> None:
+        self.name = name
+        self.kind = kind
+        self.command = command
+        self.popen = popen
+        self.started = time.time()
+        self.ended: Optional[float] = None
+        # Set when a new game takes over, so listeners don't resume work between the two.
+        self.replaced = False
+        self.cpu_percent = 0.0
+        self.rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.cpu_seconds = 0.0
+        self._last_sample = (self.started, 0.0)
+
+    @property
+    def pid(self) -> int:
+        return self.popen.pid
+
+    @property
+    def running(self) -> bool:
+        return self.ended is None
+
+    def sample(self) -> None:
+        usage = read_proc_usage(self.pid)
+        if usage is None:
+            return
+        now = time.time()
+        last_time, last_cpu = self._last_sample
+        if now > last_time:
+            self.cpu_percent = 100.0 * (usage["cpu_seconds"] - last_cpu) / (now - last_time)
+        self._last_sample = (now, usage["cpu_seconds"])
+        self.cpu_seconds = usage["cpu_seconds"]
+        self.rss_mb = usage["rss_mb"]
+        self.peak_rss_mb = max(self.peak_rss_mb, self.rss_mb)
+
+    def describe(self) -> str:
+        runtime = (self.ended or time.time()) - self.started
+        average = 100.0 * self.cpu_seconds / runtime if runtime else 0.0
+        return (
+            f"{self.name} (pid {self.pid}): {runtime:.0f}s, {self.cpu_percent:.0f}% CPU now, "
+            f"{average:.0f}% average, {self.rss_mb:.0f} MB RSS ({self.peak_rss_mb:.0f} MB peak)"
+        )
+
+
+class ProcessSupervisor:
+    """Launch children in their own session, one per name, and reap them when they exit.
+
+    Only one ``game`` runs at a time: launching another replaces it. Any
+    other name that is still running is not started twice. Each child gets a
+    waiter thread that samples its CPU and RSS from ``/proc`` every
+    ``sample_interval`` seconds and terminates it if it goes over
+    ``max_rss_mb``, which defaults to three quarters of physical memory so a
+    runaway child is stopped before the kernel's OOM killer picks BMO itself.
+    Listeners hear ``start`` and ``exit`` so BMO can stop its own background
+    work while a game has the CPU; a game that is exiting because another
+    replaced it has ``replaced`` set.
+    """
+
+    def __init__(
+        self,
+        sample_interval: Optional[float] = None,
+        max_rss_mb: Optional[float] = None,
+        app_nice: Optional[int] = None,
+    ) -> None:
+        self.sample_interval = sample_interval if sample_interval is not None else float(
+            os.environ.get("BMO_CHILD_SAMPLE_S", 5)
+        )
+        if max_rss_mb is None:
+            configured = os.environ.get("BMO_CHILD_MAX_RSS_MB")
+            max_rss_mb = float(configured) if configured else _default_max_rss_mb()
+        self.max_rss_mb = max_rss_mb
+        self.app_nice = app_nice if app_nice is not None else int(os.environ.get("BMO_CHILD_NICE", 5))
+        self.listeners: List[ProcessListener] = []
+        self._processes: Dict[str, ManagedProcess] = {}
+        self._lock = threading.Lock()
+
+    def running(self, kind: Optional[str] = None) -> List[ManagedProcess]:
+        with self._lock:
+            return [process for process in self._processes.values() if kind is None or process.kind == kind]
+
+    def launch(self, name: str, command: List[str], kind: str = APP) -> ManagedProcess:
+        """Start ``command`` unless ``name`` is already running; a new game replaces the old one."""
+
+        with self._lock:
+            existing = self._processes.get(name)
+            if existing is not None and kind != GAME:
+                return existing
+            previous_games = [process for process in self._processes.values() if process.kind == GAME and kind == GAME]
+        for previous in previous_games:
+            previous.replaced = True
+            self.terminate(previous)
+
+        try:
+            popen = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError:
+            for previous in previous_games:  # nothing took over after all
+                previous.replaced = False
+                self._notify("exit", previous)
+            raise
+        self._apply_limits(popen.pid, kind)
+        process = ManagedProcess(name, kind, command, popen)
+        with self._lock:
+            self._processes[name] = process
+        threading.Thread(target=self._watch, args=(process,), name=f"bmo-reap-{popen.pid}", daemon=True).start()
+        self._notify("start", process)
+        return process
+
+    def terminate(self, process: ManagedProcess, timeout: float = 3.0) -> None:
+        """Ask the process group to exit, then kill it if it hasn't after ``timeout``."""
+
+        if not process.running:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.popen.wait(timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def shutdown(self) -> None:
+        for process in self.running():
+            if process.kind != SYSTEM:
+                self.terminate(process)
+
+    def describe(self) -> str:
+        return "; ".join(process.describe() for process in self.running()) or "no child processes"
+
+    def _apply_limits(self, pid: int, kind: str) -> None:
+        """Renice apps and disable core dumps from outside the child.
+
+        ``preexec_fn`` would do this before ``exec`` but can deadlock the fork
+        in a process with as many threads as BMO, so the limits are applied
+        right after the spawn instead.
+        """
+
+        try:
+            resource.prlimit(pid, resource.RLIMIT_CORE, (0, 0))
+            if kind == APP and self.app_nice:
+                os.setpriority(os.PRIO_PROCESS, pid, self.app_nice)
+        except (AttributeError, OSError) as exc:  # the child may already have exited
+            print(f"Could not limit pid {pid}: {exc}")
+
+    def _watch(self, process: ManagedProcess) -> None:
+        while True:
+            try:
+                process.popen.wait(self.sample_interval)
+                break
+            except subprocess.TimeoutExpired:
+                process.sample()
+                if self.max_rss_mb and process.rss_mb > self.max_rss_mb:
+                    print(f"{process.name} is using {process.rss_mb:.0f} MB; stopping it")
+                    self.terminate(process)
+        process.ended = time.time()
+        with self._lock:
+            if self._processes.get(process.name) is process:
+                del self._processes[process.name]
+        print(f"{process.describe()}, exited with {process.popen.returncode}")
+        self._notify("exit", process)
+
+    def _notify(self, event: str, process: ManagedProcess) -> None:
+        for listener in list(self.listeners):
+            try:
+                listener(event, process)
+            except Exception as exc:  # pragma: no cover - runtime guard
+                print(f"Process listener failed: {exc}")
@@ -0,0 +1,349 @@
+"""Persistent index of RetroArch ROMs with fuzzy title search.
+
+Run from the repository root to build the index or try a lookup::
+
+    python rom_library.py [--rescan] ["mario kart"]
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from intent_index import normalize, trigrams
+
+INDEX_VERSION = 1
+
+# Folder names and aliases a spoken request may use, keyed by platform.
+PLATFORM_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "nes": ("nes", "nintendo", "famicom"),
+    "snes": ("snes", "super nintendo", "super nes", "super famicom", "sfc"),
+    "n64": ("n64", "nintendo 64"),
+    "gb": ("gb", "gameboy", "game boy"),
+    "gbc": ("gbc", "gameboy color", "game boy color"),
+    "gba": ("gba", "gameboy advance", "game boy advance"),
+    "genesis": ("genesis", "megadrive", "mega drive", "sega"),
+    "mastersystem": ("mastersystem", "master system", "sms"),
+    "psx": ("psx", "ps1", "playstation"),
+    "arcade": ("arcade", "mame", "fba", "fbneo"),
+}
+EXTENSION_PLATFORMS = {
+    ".nes": "nes",
+    ".sfc": "snes",
+    ".smc": "snes",
+    ".n64": "n64",
+    ".z64": "n64",
+    ".v64": "n64",
+    ".gb": "gb",
+    ".gbc": "gbc",
+    ".gba": "gba",
+    ".md": "genesis",
+    ".gen": "genesis",
+    ".smd": "genesis",
+    ".sms": "mastersystem",
+    ".cue": "psx",
+    ".chd": "psx",
+    ".pbp": "psx",
+}
+ROM_EXTENSIONS = set(EXTENSION_PLATFORMS) | {".zip", ".7z", ".iso"}
+DEFAULT_CORES = {
+    "nes": "fceumm_libretro.so",
+    "snes": "snes9x_libretro.so",
+    "n64": "mupen64plus_next_libretro.so",
+    "gb": "gambatte_libretro.so",
+    "gbc": "gambatte_libretro.so",
+    "gba": "mgba_libretro.so",
+    "genesis": "genesis_plus_gx_libretro.so",
+    "mastersystem": "genesis_plus_gx_libretro.so",
+    "psx": "pcsx_rearmed_libretro.so",
+    "arcade": "fbneo_libretro.so",
+}
+
+_TAGS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_SEPARATORS = re.compile(r"[_.]+")
+_COMMAND_VERBS = ("play", "launch", "start", "load", "run")
+_ALIAS_PLATFORMS = {alias: platform for platform, aliases in PLATFORM_ALIASES.items() for alias in aliases}
+
+
+@dataclass
+class RomEntry:
+    """One game in the library and the core RetroArch should load it with."""
+
+    title: str
+    platform: Optional[str]
+    path: str
+    core: Optional[str] = None
+
+
+@dataclass
+class RomMatch:
+    rom: RomEntry
+    score: float
+
+
+def clean_title(filename: str) -> str:
+    """Turn ``Mario_Kart_64 (USA) [!].z64`` into ``Mario Kart 64``."""
+
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return " ".join(_SEPARATORS.sub(" ", _TAGS.sub(" ", stem)).split()) or stem
+
+
+class RomLibrary:
+    """Index ROMs under the configured directories and look them up by spoken title.
+
+    The index is saved as JSON and reloaded on start. A rescan only lists
+    directories whose mtime changed since the last scan (adding, removing or
+    renaming a file updates its directory's mtime), so refreshing a large,
+    mostly unchanged collection costs a ``stat`` per directory. Lookups go
+    through an in-memory trigram index and never touch the filesystem.
+    """
+
+    def __init__(
+        self,
+        directories: Optional[List[str]] = None,
+        index_path: Optional[str] = None,
+        cores_dir: Optional[str] = None,
+        cores: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if directories is None:
+            configured = os.environ.get("BMO_ROM_DIRS") or os.path.join("~", "RetroPie", "roms")
+            directories = [path for path in configured.split(os.pathsep) if path]
+        self.directories = [os.path.abspath(os.path.expanduser(path)) for path in directories]
+        self.index_path = index_path or os.environ.get("BMO_ROM_INDEX") or os.path.join(
+            os.path.expanduser("~"), ".cache", "bmo", "roms.json"
+        )
+        self.cores_dir = os.path.expanduser(
+            cores_dir or os.environ.get("BMO_RETROARCH_CORES_DIR") or os.path.join("~", ".config", "retroarch", "cores")
+        )
+        self.cores = dict(DEFAULT_CORES, **(cores or {}))
+        self.roms: List[RomEntry] = []
+        self._dirs: Dict[str, Dict] = {}
+        self._titles: List[str] = []
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self) -> None:
+        """Load the saved index, scanning the directories if there is none yet."""
+
+        with self._lock:
+            if self._loaded:
+                return
+            self._load_index()
+            self._loaded = True
+        if not self.roms and not self._dirs:
+            self.refresh()
+
+    def refresh(self) -> Dict[str, float]:
+        """Rescan the ROM directories, reusing listings of unchanged directories, and save the index."""
+
+        started = time.perf_counter()
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+                self._loaded = True
+            known = {rom.path: rom for rom in self.roms}
+            old_dirs = self._dirs
+        dirs: Dict[str, Dict] = {}
+        roms: List[RomEntry] = []
+        listed = 0
+        stack = [(root, root) for root in self.directories]
+        while stack:
+            directory, root = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            cached = old_dirs.get(directory)
+            if cached is not None and cached["mtime"] == mtime:
+                files, subdirs = cached["files"], cached["subdirs"]
+            else:
+                files, subdirs = self._list(directory)
+                listed += 1
+            dirs[directory] = {"mtime": mtime, "files": files, "subdirs": subdirs}
+            stack.extend((os.path.join(directory, name), root) for name in subdirs)
+            for name in files:
+                path = os.path.join(directory, name)
+                roms.append(known.get(path) or self._entry(path, root))
+        with self._lock:
+            changed = listed or dirs.keys() != old_dirs.keys()
+            self._dirs = dirs
+            self._set_roms(roms)
+            if changed:
+                self._save_index()
+        return {
+            "roms": len(roms),
+            "directories": len(dirs),
+            "listed": listed,
+            "scan_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def search(self, query: str, platform: Optional[str] = None, limit: int = 5) -> List[RomMatch]:
+        """Rank ROMs by trigram similarity to ``query``, best first.
+
+        A platform named at the end of the query ("mario kart on the n64")
+        filters the results the same way as passing ``platform``.
+        """
+
+        self.ensure_loaded()
+        query, spoken_platform = self._split_platform(normalize(query))
+        platform = self._platform_for(platform) or spoken_platform
+        if not query:
+            return []
+        grams = trigrams(query)
+        overlap: Dict[int, int] = defaultdict(int)
+        with self._lock:
+            for gram in grams:
+                for rom_id in self._postings.get(gram, ()):
+                    overlap[rom_id] += 1
+            candidates = [(rom_id, shared, self.roms[rom_id], self._sizes[rom_id]) for rom_id, shared in overlap.items()]
+        matches: List[RomMatch] = []
+        for _, shared, rom, size in candidates:
+            if platform and rom.platform != platform:
+                continue
+            # Mix Dice similarity with how much of the query the title covers,
+            # so "mario kart" still ranks "Mario Kart 64" above "Mario Party".
+            dice = 2.0 * shared / (len(grams) + size)
+            coverage = shared / len(grams)
+            matches.append(RomMatch(rom, (dice + coverage) / 2))
+        matches.sort(key=lambda match: (-match.score, len(match.rom.title)))
+        return matches[:limit]
+
+    def match_command(
+        self, text: str, threshold: Optional[float] = None, margin: Optional[float] = None
+    ) -> Optional[RomMatch]:
+        """Resolve an utterance like "play mario kart" to a ROM, or return None.
+
+        Only utterances that start with a launch verb are considered. The best
+        match must clear ``threshold`` (``BMO_ROM_FAST_MATCH``) and beat the
+        runner-up by ``margin`` (``BMO_ROM_FAST_MARGIN``), so "play mario"
+        goes to the LLM instead of guessing between Mario Party and Mario Kart.
+        """
+
+        if threshold is None:
+            threshold = float(os.environ.get("BMO_ROM_FAST_MATCH", 0.8))
+        if margin is None:
+            margin = float(os.environ.get("BMO_ROM_FAST_MARGIN", 0.1))
+        words = normalize(text).split()
+        if len(words) < 2 or words[0] not in _COMMAND_VERBS:
+            return None
+        matches = self.search(" ".join(words[1:]), limit=2)
+        if not matches or matches[0].score < threshold:
+            return None
+        if len(matches) > 1 and matches[0].score - matches[1].score < margin:
+            return None
+        return matches[0]
+
+    def _list(self, directory: str) -> Tuple[List[str], List[str]]:
+        files: List[str] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                    elif os.path.splitext(entry.name)[1].lower() in ROM_EXTENSIONS:
+                        files.append(entry.name)
+        except OSError:
+            pass
+        return sorted(files), sorted(subdirs)
+
+    def _entry(self, path: str, root: str) -> RomEntry:
+        relative = os.path.relpath(path, root).split(os.sep)
+        platform = self._platform_for(relative[0]) if len(relative) > 1 else None
+        platform = platform or EXTENSION_PLATFORMS.get(os.path.splitext(path)[1].lower())
+        core = None
+        if platform in self.cores:
+            candidate = os.path.join(self.cores_dir, self.cores[platform])
+            core = candidate if os.path.exists(candidate) else None
+        return RomEntry(clean_title(path), platform, path, core)
+
+    @staticmethod
+    def _platform_for(name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        return _ALIAS_PLATFORMS.get(name.lower().replace("_", " ").replace("-", " ").strip())
+
+    @staticmethod
+    def _split_platform(query: str) -> Tuple[str, Optional[str]]:
+        for alias in sorted(_ALIAS_PLATFORMS, key=len, reverse=True):
+            pattern = re.compile(rf"(?:\b(?:on|for) (?:the )?)?\b{re.escape(alias)}$")
+            stripped, count = pattern.subn(" ", query)
+            if count and stripped.strip():
+                return " ".join(stripped.split()), _ALIAS_PLATFORMS[alias]
+        return query, None
+
+    def _set_roms(self, roms: List[RomEntry]) -> None:
+        roms.sort(key=lambda rom: rom.path)
+        self.roms = roms
+        self._titles = [normalize(rom.title) for rom in roms]
+        self._sizes = []
+        self._postings = defaultdict(list)
+        for rom_id, title in enumerate(self._titles):
+            grams = trigrams(title)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(rom_id)
+
+    def _load_index(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("roots") != self.directories:
+            return
+        self._dirs = data.get("dirs", {})
+        self._set_roms([RomEntry(**rom) for rom in data.get("roms", [])])
+
+    def _save_index(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "roots": self.directories,
+            "dirs": self._dirs,
+            "roms": [asdict(rom) for rom in self.roms],
+        }
+        try:
+            directory = os.path.dirname(self.index_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(data, handle)
+            os.replace(temp_path, self.index_path)
+        except OSError as exc:  # pragma: no cover - e.g. read-only SD card
+            print(f"Could not save ROM index: {exc}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", nargs="?", help="title to look up")
+    parser.add_argument("--rescan", action="store_true", help="rescan the ROM directories first")
+    args = parser.parse_args()
+
+    library = RomLibrary()
+    if args.rescan:
+        stats = library.refresh()
+        print(
+            f"Indexed {stats['roms']} ROMs in {stats['directories']} directories "
+            f"({stats['listed']} listed) in {stats['scan_ms']:.0f}ms"
+        )
+    if args.query:
+        started = time.perf_counter()
+        matches = library.search(args.query)
+        elapsed = (time.perf_counter() - started) * 1000
+        for match in matches:
+            print(f"{match.score:.2f}  {match.rom.title} [{match.rom.platform}] {match.rom.path}")
+        print(f"{len(matches)} matches in {elapsed:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
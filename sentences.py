@@ -0,0 +1,100 @@
+"""Split replies into speakable sentences for pipelined text-to-speech."""
+
+import re
+from typing import List, Optional
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:—])\s+")
+
+MIN_CHARS = 12
+MAX_CHARS = 180
+
+
+def split_sentences(text: str, min_chars: int = MIN_CHARS, max_chars: int = MAX_CHARS) -> List[str]:
+    """Return ``text`` as an ordered list of sentences.
+
+    Sentences longer than ``max_chars`` are broken at clause punctuation so no
+    single request stalls the pipeline, and fragments shorter than
+    ``min_chars`` are merged into their neighbour to keep natural prosody.
+    """
+
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        pieces.extend(_split_long(sentence, max_chars))
+
+    merged: List[str] = []
+    for piece in pieces:
+        if merged and (len(merged[-1]) < min_chars or len(piece) < min_chars):
+            if len(merged[-1]) + len(piece) + 1 <= max_chars:
+                merged[-1] = f"{merged[-1]} {piece}"
+                continue
+        merged.append(piece)
+    return merged
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    chunks: List[str] = []
+    current = ""
+    for clause in _CLAUSE_END.split(sentence):
+        candidate = f"{current} {clause}".strip()
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = clause
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SentenceAccumulator:
+    """Collect streamed text and release it one complete sentence at a time."""
+
+    def __init__(self, min_chars: int = MIN_CHARS, max_chars: int = MAX_CHARS) -> None:
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add ``delta`` and return any sentences that are now complete."""
+
+        self._buffer += delta
+        ready: List[str] = []
+        while True:
+            sentence = self._take_sentence()
+            if sentence is None:
+                return ready
+            ready.append(sentence)
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has ended."""
+
+        remainder, self._buffer = self._buffer, ""
+        return split_sentences(remainder, self.min_chars, self.max_chars)
+
+    def _take_sentence(self) -> Optional[str]:
+        search_from = 0
+        while True:
+            match = _SENTENCE_END.search(self._buffer, search_from)
+            if match is None:
+                break
+            sentence = " ".join(self._buffer[:match.start()].split())
+            if len(sentence) >= self.min_chars:
+                self._buffer = self._buffer[match.end():]
+                return sentence
+            search_from = match.end()
+
+        if len(self._buffer) > self.max_chars:
+            clauses = list(_CLAUSE_END.finditer(self._buffer, 0, self.max_chars))
+            cut = clauses[-1] if clauses else None
+            if cut is not None:
+                sentence = " ".join(self._buffer[:cut.start()].split())
+                self._buffer = self._buffer[cut.end():]
+                return sentence
+        return None
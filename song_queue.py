@@ -0,0 +1,296 @@
+"""Gapless playlist for the ``songs/`` library, decoded and played as a stream.
+
+Each track is decoded by ``ffmpeg`` into one fixed PCM format and written to a
+single PyAudio output stream that stays open while the queue has songs, so
+consecutive tracks join without a gap. Decoding runs ahead of playback into a
+bounded buffer: memory stays flat however long a track is, and the next
+track's decoder starts while the current one is still playing out of the
+buffer.
+"""
+
+import glob
+import itertools
+import os
+import queue
+import random
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from audio_envelope import Envelope, EnvelopeAccumulator
+from intent_index import normalize, trigrams
+
+_AUDIO_EXTENSIONS = (".mp3", ".ogg", ".wav", ".flac", ".m4a")
+_CLOSED = object()
+
+# Listener events: "start" (new track), "pause", "resume" and "finish" (queue ran out or was stopped).
+MusicListener = Callable[[str, Optional["Track"], Optional[Envelope], float], None]
+
+
+@dataclass
+class Track:
+    title: str
+    path: str
+    serial: int = 0
+
+
+class SongQueue:
+    """Queue, skip and shuffle songs, played gaplessly from a streaming decoder.
+
+    Listeners are called from the playback thread with ``(event, track,
+    envelope, started)``. ``envelope`` grows as the track plays and
+    ``started`` is the wall-clock time its first sample would have played,
+    adjusted for pauses, so the echo gate can follow the music.
+    """
+
+    def __init__(
+        self,
+        directory: str = "./songs",
+        buffer_seconds: Optional[float] = None,
+        sample_rate: int = 44100,
+        channels: int = 2,
+        chunk_frames: int = 4096,
+    ) -> None:
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.chunk_bytes = chunk_frames * channels * 2
+        buffer_seconds = buffer_seconds if buffer_seconds is not None else float(
+            os.environ.get("BMO_MUSIC_BUFFER_S", 4)
+        )
+        self.buffer_chunks = max(int(buffer_seconds * sample_rate / chunk_frames), 2)
+        self.listeners: List[MusicListener] = []
+        self.current: Optional[Track] = None
+        self._upcoming: "deque[Track]" = deque()
+        self._buffer: "queue.Queue" = queue.Queue(maxsize=self.buffer_chunks)
+        self._cond = threading.Condition()
+        self._serials = itertools.count(1)
+        self._last_serial = 0
+        self._skip_through = 0
+        self._decoding: Optional[Track] = None
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def playing(self) -> bool:
+        with self._cond:
+            return self.current is not None or self._decoding is not None or bool(self._upcoming)
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def library(self) -> List[Track]:
+        paths = sorted(
+            path for path in glob.glob(os.path.join(self.directory, "*")) if path.lower().endswith(_AUDIO_EXTENSIONS)
+        )
+        return [Track(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+
+    def find(self, query: str, threshold: float = 0.5) -> Optional[Track]:
+        """Best title match for ``query`` in the library, or None."""
+
+        wanted = normalize(query)
+        if not wanted:
+            return None
+        grams = trigrams(wanted)
+        best, best_score = None, threshold
+        for track in self.library():
+            title_grams = trigrams(normalize(track.title))
+            shared = len(grams & title_grams)
+            score = (2.0 * shared / (len(grams) + len(title_grams)) + shared / len(grams)) / 2
+            if score >= best_score:
+                best, best_score = track, score
+        return best
+
+    def play(self, tracks: List[Track]) -> None:
+        """Replace whatever is playing with ``tracks``."""
+
+        with self._cond:
+            self._upcoming.clear()
+            self._skip_through = self._last_serial
+            self._upcoming.extend(Track(track.title, track.path) for track in tracks)
+            self._cond.notify_all()
+        self._ensure_threads()
+
+    def enqueue(self, track: Track) -> None:
+        with self._cond:
+            self._upcoming.append(Track(track.title, track.path))
+            self._cond.notify_all()
+        self._ensure_threads()
+
+    def skip(self) -> Optional[Track]:
+        """Skip the current track and return the one that will play next, if any."""
+
+        with self._cond:
+            playing = self.current or self._decoding
+            if playing is not None:
+                self._skip_through = max(self._skip_through, playing.serial)
+            if self._decoding is not None and self._decoding is not playing:
+                return self._decoding
+            return self._upcoming[0] if self._upcoming else None
+
+    def shuffle(self) -> None:
+        """Shuffle the songs that haven't started decoding yet."""
+
+        with self._cond:
+            upcoming = list(self._upcoming)
+            random.shuffle(upcoming)
+            self._upcoming = deque(upcoming)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._upcoming.clear()
+            self._skip_through = self._last_serial
+        self._resumed.set()
+
+    def pause(self) -> None:
+        """Hold playback (e.g. while BMO listens or talks); decoding stops once the buffer is full."""
+
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        self._resumed.set()
+
+    def close(self) -> None:
+        self.stop()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._threads:
+            self._put(_CLOSED, force=True)
+
+    def _ensure_threads(self) -> None:
+        if self._threads:
+            return
+        if shutil.which("ffmpeg") is None:
+            print("ffmpeg is needed to play songs")
+        self._threads = [
+            threading.Thread(target=self._decode_loop, name="bmo-music-decode", daemon=True),
+            threading.Thread(target=self._play_loop, name="bmo-music-play", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _skipped(self, track: Track) -> bool:
+        return track.serial <= self._skip_through
+
+    def _put(self, item, force: bool = False) -> None:
+        while True:
+            try:
+                self._buffer.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._closed and not force:
+                    return
+
+    def _decode_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._upcoming and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                track = self._upcoming.popleft()
+                track.serial = self._last_serial = next(self._serials)
+                self._decoding = track
+            try:
+                self._decode(track)
+            finally:
+                with self._cond:
+                    self._decoding = None
+                self._put((track, None))
+
+    def _decode(self, track: Track) -> None:
+        try:
+            process = subprocess.Popen(
+                [
+                    "ffmpeg", "-v", "error", "-i", track.path,
+                    "-f", "s16le", "-ac", str(self.channels), "-ar", str(self.sample_rate), "-",
+                ],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as exc:
+            print(f"Could not decode {track.path}: {exc}")
+            return
+        try:
+            while not self._skipped(track) and not self._closed:
+                data = process.stdout.read(self.chunk_bytes)
+                if not data:
+                    break
+                self._put((track, data))
+        finally:
+            process.kill()
+            process.wait()
+
+    def _play_loop(self) -> None:
+        import pyaudio
+
+        audio = None
+        output = None
+        accumulator: Optional[EnvelopeAccumulator] = None
+        played = 0.0
+        try:
+            while True:
+                item = self._buffer.get()
+                if item is _CLOSED:
+                    return
+                track, pcm = item
+                if pcm is None or self._skipped(track):
+                    if pcm is None:
+                        if self.current is track:
+                            self.current = None
+                        if self._idle():
+                            if output is not None:
+                                output.stop_stream()
+                                output.close()
+                                output = None
+                            self._notify("finish", None, None, time.time())
+                    continue
+                if not self._resumed.is_set():
+                    if output is not None:
+                        output.stop_stream()
+                    self._notify("pause", track, None, time.time())
+                    self._resumed.wait()
+                    if output is not None:
+                        output.start_stream()
+                    if self._skipped(track):
+                        continue
+                    if self.current is track:
+                        self._notify("resume", track, accumulator.points, time.time() - played)
+                if output is None:
+                    audio = audio or pyaudio.PyAudio()
+                    output = audio.open(
+                        format=pyaudio.paInt16, channels=self.channels, rate=self.sample_rate, output=True
+                    )
+                if self.current is not track:
+                    self.current = track
+                    accumulator = EnvelopeAccumulator()
+                    played = 0.0
+                    print(f"Now playing: {track.title}")
+                    self._notify("start", track, accumulator.points, time.time())
+                accumulator.feed(pcm, 2, self.channels, self.sample_rate)
+                output.write(pcm)
+                played += len(pcm) / (2 * self.channels * self.sample_rate)
+        finally:
+            if output is not None:
+                output.close()
+            if audio is not None:
+                audio.terminate()
+
+    def _idle(self) -> bool:
+        with self._cond:
+            return not self._upcoming and self._decoding is None and self._buffer.empty()
+
+    def _notify(self, event: str, track: Optional[Track], envelope: Optional[Envelope], started: float) -> None:
+        for listener in list(self.listeners):
+            try:
+                listener(event, track, envelope, started)
+            except Exception as exc:  # pragma: no cover - runtime guard
+                print(f"Music listener failed: {exc}")
@@ -0,0 +1,267 @@
+"""Speech-to-text backends: Google Web Speech or a local model kept in memory."""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_capture import SAMPLE_RATE, frames_to_pcm
+
+GOOGLE = "google"
+VOSK = "vosk"
+WHISPER = "whisper"
+ENGINES = (GOOGLE, VOSK, WHISPER)
+
+
+class RecognitionSession(ABC):
+    """One utterance being transcribed; frames are fed as they are captured."""
+
+    def accept(self, frame: Sequence[int]) -> Optional[str]:
+        """Feed one frame and return the partial transcript if it changed."""
+
+        return None
+
+    @abstractmethod
+    def finish(self) -> str:
+        """Return the final transcript, raising ``sr.UnknownValueError`` when nothing was understood."""
+
+
+class SpeechToText(ABC):
+    """Base class for transcription engines.
+
+    ``streaming`` engines emit partial transcripts while the user is still
+    speaking; the others only transcribe once the utterance has ended.
+    Finished transcriptions are timed from the end of capture so engines can
+    be compared on the latency they add to each turn.
+    """
+
+    name = ""
+    streaming = False
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE) -> None:
+        self.sample_rate = sample_rate
+        self._latencies: List[float] = []
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> Dict[str, float]:
+        return {}
+
+    @abstractmethod
+    def start(self) -> RecognitionSession:
+        ...
+
+    def transcribe(self, pcm: bytes) -> str:
+        """Transcribe a finished utterance of 16-bit mono PCM."""
+
+        session = self.start()
+        samples = np.frombuffer(pcm, dtype="<i2")
+        for offset in range(0, len(samples), 512):
+            session.accept(samples[offset:offset + 512])
+        return session.finish()
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            del self._latencies[:-200]
+
+    def latency_stats(self) -> Dict[str, float]:
+        """Median and worst finish latency in milliseconds over recent turns."""
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return {}
+        return {
+            "count": len(latencies),
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "max_ms": latencies[-1] * 1000,
+        }
+
+
+class _BufferedSession(RecognitionSession):
+    def __init__(self, engine: "SpeechToText") -> None:
+        self.engine = engine
+        self.frames: List[Sequence[int]] = []
+
+    def accept(self, frame: Sequence[int]) -> Optional[str]:
+        self.frames.append(frame)
+        return None
+
+    def finish(self) -> str:
+        return self.engine._recognize(frames_to_pcm(self.frames))
+
+
+class GoogleSpeechToText(SpeechToText):
+    """Send the finished utterance to the Google Web Speech API."""
+
+    name = GOOGLE
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE) -> None:
+        super().__init__(sample_rate)
+        self.recognizer = sr.Recognizer()
+
+    def start(self) -> RecognitionSession:
+        return _BufferedSession(self)
+
+    def _recognize(self, pcm: bytes) -> str:
+        if not pcm:
+            raise sr.UnknownValueError()
+        return self.recognizer.recognize_google(sr.AudioData(pcm, self.sample_rate, 2))
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, recognizer) -> None:
+        self.recognizer = recognizer
+        self.segments: List[str] = []
+        self.partial = ""
+
+    def accept(self, frame: Sequence[int]) -> Optional[str]:
+        if self.recognizer.AcceptWaveform(frames_to_pcm([frame])):
+            self._add_segment(self.recognizer.Result())
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        text = " ".join(self.segments + ([partial] if partial else []))
+        if text == self.partial:
+            return None
+        self.partial = text
+        return text
+
+    def finish(self) -> str:
+        self._add_segment(self.recognizer.FinalResult())
+        text = " ".join(self.segments)
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def _add_segment(self, result: str) -> None:
+        text = json.loads(result).get("text", "")
+        if text:
+            self.segments.append(text)
+
+
+class VoskSpeechToText(SpeechToText):
+    """Transcribe on the Pi with a Vosk model, streaming partials as frames arrive.
+
+    The model is loaded once (by :meth:`warm_up` or the first turn) and kept
+    resident; each utterance only creates a lightweight recognizer.
+    """
+
+    name = VOSK
+    streaming = True
+
+    def __init__(self, model_path: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> None:
+        super().__init__(sample_rate)
+        self.model_path = model_path or os.environ.get("BMO_VOSK_MODEL")
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def warm_up(self) -> Dict[str, float]:
+        started = time.perf_counter()
+        self._load_model()
+        return {"model_load_ms": (time.perf_counter() - started) * 1000}
+
+    def start(self) -> RecognitionSession:
+        from vosk import KaldiRecognizer
+
+        return _VoskSession(KaldiRecognizer(self._load_model(), self.sample_rate))
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from vosk import Model, SetLogLevel
+
+                SetLogLevel(-1)
+                self._model = Model(model_path=self.model_path) if self.model_path else Model(lang="en-us")
+            return self._model
+
+
+class WhisperSpeechToText(SpeechToText):
+    """Transcribe the finished utterance locally with faster-whisper.
+
+    Whisper has no incremental decoder, so this engine gives no partials but
+    avoids the network round trip entirely.
+    """
+
+    name = WHISPER
+
+    def __init__(self, model_name: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> None:
+        super().__init__(sample_rate)
+        self.model_name = model_name or os.environ.get("BMO_WHISPER_MODEL", "tiny.en")
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def warm_up(self) -> Dict[str, float]:
+        started = time.perf_counter()
+        self._load_model()
+        return {"model_load_ms": (time.perf_counter() - started) * 1000}
+
+    def start(self) -> RecognitionSession:
+        return _BufferedSession(self)
+
+    def _recognize(self, pcm: bytes) -> str:
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        if not samples.size:
+            raise sr.UnknownValueError()
+        segments, _ = self._load_model().transcribe(samples, language="en", beam_size=1)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def _load_model(self):
+        with self._model_lock:
+            if self._model is None:
+                from faster_whisper import WhisperModel
+
+                self._model = WhisperModel(self.model_name, device="cpu", compute_type="int8")
+            return self._model
+
+
+class PartialStabilizer:
+    """Report a partial transcript once it has stopped changing for ``stable_ms``."""
+
+    def __init__(self, stable_ms: Optional[int] = None) -> None:
+        self.stable_ms = stable_ms if stable_ms is not None else int(os.environ.get("BMO_STT_STABLE_MS", 300))
+        self._text = ""
+        self._since = 0.0
+
+    def update(self, partial: Optional[str], now: Optional[float] = None) -> Optional[str]:
+        """Record ``partial`` (None when unchanged) and return the text once it is stable."""
+
+        now = time.monotonic() if now is None else now
+        if partial is not None and partial != self._text:
+            self._text = partial
+            self._since = now
+            return None
+        if self._text and (now - self._since) * 1000 >= self.stable_ms:
+            return self._text
+        return None
+
+
+def create_speech_to_text(engine: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> SpeechToText:
+    """Build the engine named by ``engine`` or ``BMO_STT_ENGINE``, falling back to Google."""
+
+    engine = (engine or os.environ.get("BMO_STT_ENGINE", GOOGLE)).lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown speech-to-text engine {engine!r}; expected one of {ENGINES}")
+    if engine == VOSK:
+        try:
+            import vosk  # noqa: F401
+        except ImportError:
+            print("vosk is not installed; using Google speech recognition instead.")
+            return GoogleSpeechToText(sample_rate)
+        return VoskSpeechToText(sample_rate=sample_rate)
+    if engine == WHISPER:
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            print("faster-whisper is not installed; using Google speech recognition instead.")
+            return GoogleSpeechToText(sample_rate)
+        return WhisperSpeechToText(sample_rate=sample_rate)
+    return GoogleSpeechToText(sample_rate)
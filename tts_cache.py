@@ -0,0 +1,253 @@
+"""On-disk cache of synthesized speech clips keyed by what was spoken."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Dict, Optional, Tuple
+
+_AUDIO_EXTENSIONS = (".wav", ".mp3", ".ogg")
+
+
+class _PendingClip:
+    """Tracks a clip that one caller is already fetching for everyone else."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.path: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class TTSClipCache:
+    """Content-addressed clip store with size/age-bounded LRU eviction.
+
+    Clips are named after a hash of the synthesis inputs so an identical
+    request maps to the same file across restarts. Concurrent requests for the
+    same key are coalesced so only one of them reaches the network. Paths
+    handed out with ``pin=True`` are never evicted until :meth:`release`, so
+    a clip queued for playback can't be deleted before it is opened.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ) -> None:
+        self.directory = directory or os.environ.get("FISH_AUDIO_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".cache", "bmo", "tts"
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.environ.get("FISH_AUDIO_CACHE_MAX_MB", 200)) * 1024 * 1024
+        )
+        self.max_age = max_age if max_age is not None else float(
+            os.environ.get("FISH_AUDIO_CACHE_MAX_AGE_DAYS", 30)
+        ) * 86400
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._inflight: Dict[str, _PendingClip] = {}
+        self._pins: Dict[str, int] = {}
+        self._total_bytes = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(
+        text: str, model: Optional[str], speaker_id: Optional[str], audio_format: Optional[str] = None
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (text, model or "", speaker_id or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        if audio_format:
+            digest.update(audio_format.encode("utf-8"))
+        return digest.hexdigest()
+
+    def owns(self, path: str) -> bool:
+        """Return True when ``path`` lives inside the cache directory."""
+
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.directory)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the cached clip path for ``key`` and mark it recently used."""
+
+        with self._lock:
+            path = self._lookup_locked(key)
+            if path:
+                self.hits += 1
+            return path
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def get_or_create(self, key: str, fetch: Callable[[BinaryIO], Optional[str]], pin: bool = False) -> str:
+        """Return the clip for ``key``, calling ``fetch`` at most once per key.
+
+        ``fetch`` receives an open binary handle to write the audio into and
+        returns the file extension for the clip (e.g. ``".wav"``). With
+        ``pin`` the clip is kept until :meth:`release` is called for it.
+        """
+
+        with self._lock:
+            cached = self._lookup_locked(key)
+            if cached:
+                self.hits += 1
+                if pin:
+                    self._pin_locked(cached)
+                return cached
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                pending = _PendingClip()
+                self._inflight[key] = pending
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            if pin:
+                with self._lock:
+                    self._pin_locked(pending.path)
+            return pending.path
+
+        try:
+            pending.path = self._fetch_into_cache(key, fetch, pin)
+            return pending.path
+        except BaseException as exc:
+            pending.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def store(self, key: str, temp_path: str, suffix: Optional[str], pin: bool = False) -> str:
+        """Move a fully written ``temp_path`` into the cache under ``key``."""
+
+        final_path = os.path.join(self.directory, key + (suffix or ".wav"))
+        os.replace(temp_path, final_path)
+        size = os.path.getsize(final_path)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._total_bytes -= previous[1]
+                if previous[0] != final_path:
+                    self._remove_file(previous[0])
+            self._entries[key] = (final_path, size, time.time())
+            self._total_bytes += size
+            if pin:
+                self._pin_locked(final_path)
+            self._evict_locked()
+        return final_path
+
+    def release(self, path: str) -> None:
+        """Drop one pin on ``path``; evictions it was holding back happen now."""
+
+        with self._lock:
+            count = self._pins.get(path, 0) - 1
+            if count > 0:
+                self._pins[path] = count
+                return
+            self._pins.pop(path, None)
+            self._evict_locked()
+
+    def new_temp_file(self) -> Tuple[int, str]:
+        """Create a partial file inside the cache directory for streaming writes."""
+
+        return tempfile.mkstemp(suffix=".part", dir=self.directory)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+    def _fetch_into_cache(self, key: str, fetch: Callable[[BinaryIO], Optional[str]], pin: bool) -> str:
+        fd, temp_path = self.new_temp_file()
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                suffix = fetch(handle)
+            return self.store(key, temp_path, suffix, pin)
+        except BaseException:
+            self._remove_file(temp_path)
+            raise
+
+    def _lookup_locked(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        path, size, _ = entry
+        if not os.path.exists(path):
+            del self._entries[key]
+            self._total_bytes -= size
+            return None
+        now = time.time()
+        self._entries[key] = (path, size, now)
+        self._entries.move_to_end(key)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return path
+
+    def _pin_locked(self, path: str) -> None:
+        self._pins[path] = self._pins.get(path, 0) + 1
+
+    def _load_index(self) -> None:
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".part"):
+                self._remove_file(path)
+                continue
+            key, ext = os.path.splitext(name)
+            if ext not in _AUDIO_EXTENSIONS:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found.append((stat.st_mtime, key, path, stat.st_size))
+
+        for last_used, key, path, size in sorted(found):
+            self._entries[key] = (path, size, last_used)
+            self._total_bytes += size
+        with self._lock:
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        cutoff = time.time() - self.max_age if self.max_age > 0 else None
+        for key, (path, size, last_used) in list(self._entries.items()):
+            too_big = self.max_bytes > 0 and self._total_bytes > self.max_bytes and len(self._entries) > 1
+            too_old = cutoff is not None and last_used < cutoff
+            if not (too_big or too_old):
+                break
+            if path in self._pins:
+                continue  # queued or playing; evicted once released
+            del self._entries[key]
+            self._total_bytes -= size
+            self.evictions += 1
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,174 @@
+"""Per-turn latency spans written to a rotating JSONL log."""
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+class TurnTrace:
+    """Timings collected for one voice turn, from wake word to the end of playback."""
+
+    def __init__(self, turn_id: int, started: Optional[float] = None) -> None:
+        self.id = turn_id
+        self.started = time.time() if started is None else started
+        self.outcome: Optional[str] = None
+        self.spans: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, start: float, end: Optional[float] = None, **attrs) -> None:
+        """Add a span for ``stage`` between two ``time.time()`` readings."""
+
+        end = time.time() if end is None else end
+        span = {
+            "stage": stage,
+            "start_ms": round((start - self.started) * 1000, 1),
+            "duration_ms": round((end - start) * 1000, 1),
+        }
+        span.update(attrs)
+        with self._lock:
+            if self.outcome is None:
+                self.spans.append(span)
+
+    def mark(self, stage: str, **attrs) -> None:
+        """Record the time from the start of the turn to now, once per stage."""
+
+        with self._lock:
+            if any(span["stage"] == stage for span in self.spans):
+                return
+        self.record(stage, self.started, **attrs)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "turn": self.id,
+            "started": round(self.started, 3),
+            "outcome": self.outcome,
+            "total_ms": round((time.time() - self.started) * 1000, 1),
+            "spans": spans,
+        }
+
+
+class TurnTracer:
+    """Hand out :class:`TurnTrace` objects and append finished ones to a JSONL file.
+
+    Spans are recorded against the trace bound to the calling thread (see
+    :meth:`bind` and :meth:`wrap`), falling back to the most recent turn. The
+    log rotates at ``max_bytes`` keeping ``backups`` old files.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        backups: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        self.enabled = enabled if enabled is not None else os.environ.get("BMO_TRACE", "1") != "0"
+        self.path = path or os.environ.get("BMO_TRACE_PATH") or os.path.join(
+            os.path.expanduser("~"), ".cache", "bmo", "turns.jsonl"
+        )
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.environ.get("BMO_TRACE_MAX_MB", 5)) * 1024 * 1024
+        )
+        self.backups = backups if backups is not None else int(os.environ.get("BMO_TRACE_BACKUPS", 3))
+        self._current: Optional[TurnTrace] = None
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> Optional[TurnTrace]:
+        return getattr(self._local, "trace", None) or self._current
+
+    def begin(self, started: Optional[float] = None) -> Optional[TurnTrace]:
+        """Start tracing a new turn; an unfinished previous turn is logged as interrupted."""
+
+        if not self.enabled:
+            return None
+        previous = self._current
+        if previous is not None and previous.outcome is None:
+            self.finish("interrupted", previous)
+        trace = TurnTrace(next(self._ids), started)
+        self._current = trace
+        return trace
+
+    @contextmanager
+    def bind(self, trace: Optional[TurnTrace]) -> Iterator[None]:
+        """Send spans recorded on this thread to ``trace`` for the duration of the block."""
+
+        previous = getattr(self._local, "trace", None)
+        self._local.trace = trace
+        try:
+            yield
+        finally:
+            self._local.trace = previous
+
+    def wrap(self, fn: Callable) -> Callable:
+        """Bind ``fn`` to the caller's current trace, e.g. before handing it to a thread pool."""
+
+        trace = self.current
+
+        def _run(*args, **kwargs):
+            with self.bind(trace):
+                return fn(*args, **kwargs)
+
+        return _run
+
+    def record(self, stage: str, start: float, end: Optional[float] = None, **attrs) -> None:
+        trace = self.current
+        if trace is not None:
+            trace.record(stage, start, end, **attrs)
+
+    def mark(self, stage: str, **attrs) -> None:
+        trace = self.current
+        if trace is not None:
+            trace.mark(stage, **attrs)
+
+    @contextmanager
+    def span(self, stage: str, **attrs) -> Iterator[None]:
+        trace = self.current
+        start = time.time()
+        try:
+            yield
+        finally:
+            if trace is not None:
+                trace.record(stage, start, **attrs)
+
+    def finish(self, outcome: str = "done", trace: Optional[TurnTrace] = None) -> None:
+        """Close ``trace`` (default: the current turn) and append it to the log once."""
+
+        trace = trace or self._current
+        if trace is None:
+            return
+        with trace._lock:
+            if trace.outcome is not None:
+                return
+            trace.outcome = outcome
+        try:
+            self._log().info(json.dumps(trace.to_dict()))
+        except OSError as exc:  # pragma: no cover - e.g. read-only SD card
+            print(f"Could not write turn trace: {exc}")
+
+    def _log(self) -> logging.Logger:
+        with self._lock:
+            if self._logger is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("bmo.turns")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._logger = logger
+            return self._logger
+
+
+tracer = TurnTracer()
@@ -0,0 +1,80 @@
+"""Background execution of voice turns with cancellation of stale work."""
+
+import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class TurnCancelled(Exception):
+    """Raised inside a turn once a newer turn has replaced it."""
+
+
+class Turn:
+    """Handle passed to each turn so pipeline stages can bail out early."""
+
+    def __init__(self, turn_id: int) -> None:
+        self.id = turn_id
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise :class:`TurnCancelled` if the turn is stale."""
+
+        if self._cancelled.is_set():
+            raise TurnCancelled(f"turn {self.id} was cancelled")
+
+
+class TurnWorker:
+    """Run capture → STT → routing → TTS for one turn at a time off the UI thread.
+
+    Starting a turn cancels the previous one. A second worker thread lets the
+    new turn begin while a stale turn is still unwinding from a blocking call.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bmo-turn")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.current: Optional[Turn] = None
+
+    def start_turn(self, target: Callable[[Turn], None]) -> Turn:
+        with self._lock:
+            if self.current is not None:
+                self.current.cancel()
+            turn = Turn(next(self._ids))
+            self.current = turn
+        future = self._executor.submit(self._run, target, turn)
+        future.add_done_callback(self._report_failure)
+        return turn
+
+    def cancel_current(self) -> None:
+        with self._lock:
+            if self.current is not None:
+                self.current.cancel()
+                self.current = None
+
+    def shutdown(self) -> None:
+        self.cancel_current()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run(target: Callable[[Turn], None], turn: Turn) -> None:
+        try:
+            target(turn)
+        except TurnCancelled:
+            pass
+
+    @staticmethod
+    def _report_failure(future: Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:  # pragma: no cover - runtime guard
+            print(f"Voice turn failed: {error}")
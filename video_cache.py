@@ -0,0 +1,166 @@
+"""One-time transcodes of BMO's videos to the display size and a Pi-friendly codec."""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class VideoTranscodeCache:
+    """Store each video scaled to the display and re-encoded as baseline H.264.
+
+    Transcodes are named after a hash of the source file's contents and the
+    encoding settings, so an edited video or a different screen gets a fresh
+    copy and an unchanged one is never encoded twice. Source hashes are kept
+    in an index keyed by size and mtime so lookups don't reread the video.
+    :meth:`get` runs on the UI thread and only stats the file: hashing a new
+    or edited video and running ffmpeg both happen in the background, and
+    until a transcode exists the original file is played.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        directory: Optional[str] = None,
+        crf: Optional[int] = None,
+    ) -> None:
+        configured = os.environ.get("BMO_VIDEO_SIZE")
+        if configured:
+            width, height = configured.lower().split("x")
+            size = (int(width), int(height))
+        self.width, self.height = (int(value) // 2 * 2 for value in size)
+        self.directory = directory or os.environ.get("BMO_VIDEO_CACHE_DIR") or os.path.join(
+            os.path.expanduser("~"), ".cache", "bmo", "videos"
+        )
+        self.crf = crf if crf is not None else int(os.environ.get("BMO_VIDEO_CRF", 26))
+        self.enabled = os.environ.get("BMO_VIDEO_CACHE", "1") != "0" and shutil.which("ffmpeg") is not None
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._hashes: Dict[str, list] = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._work = threading.Semaphore(1)
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_index()
+
+    def get(self, source: str) -> str:
+        """Return the transcoded path for ``source``, or ``source`` itself until it is ready."""
+
+        if not self.enabled:
+            return source
+        digest = self._indexed_hash(source)
+        if digest is not None:
+            target = self._target(source, digest)
+            if os.path.exists(target):
+                return target
+        self._schedule(source)
+        return source
+
+    def prepare(self, sources: Iterable[str]) -> None:
+        """Queue transcodes for ``sources`` that don't have one yet."""
+
+        for source in sources:
+            self.get(source)
+
+    def _schedule(self, source: str) -> None:
+        key = os.path.abspath(source)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        threading.Thread(target=self._transcode, args=(source,), daemon=True).start()
+
+    def _transcode(self, source: str) -> None:
+        try:
+            with self._work:  # one hash or ffmpeg at a time so the UI keeps a core
+                digest = self._source_hash(source)
+                if digest is None:
+                    return
+                target = self._target(source, digest)
+                if not os.path.exists(target):
+                    self._encode(source, target)
+        finally:
+            with self._lock:
+                self._pending.discard(os.path.abspath(source))
+
+    def _encode(self, source: str, target: str) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".mp4")
+        os.close(fd)
+        command = [
+            "nice", "-n", "19",
+            "ffmpeg", "-y", "-v", "error", "-i", source,
+            "-vf", (
+                f"scale={self.width}:{self.height}:force_original_aspect_ratio=decrease,"
+                "scale=trunc(iw/2)*2:trunc(ih/2)*2"
+            ),
+            "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "baseline", "-pix_fmt", "yuv420p",
+            "-crf", str(self.crf),
+            "-c:a", "aac", "-b:a", "96k",
+            "-movflags", "+faststart",
+            temp_path,
+        ]
+        if shutil.which("nice") is None:
+            command = command[3:]
+        try:
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+            os.replace(temp_path, target)
+            print(f"Transcoded {source} for {self.width}x{self.height}")
+        except (OSError, subprocess.CalledProcessError) as exc:
+            print(f"Could not transcode {source}: {exc}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _target(self, source: str, digest: str) -> str:
+        settings = f"{self.width}x{self.height}-crf{self.crf}"
+        name = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.directory, f"{name}-{digest[:16]}-{settings}.mp4")
+
+    def _indexed_hash(self, source: str) -> Optional[str]:
+        """The indexed hash of ``source`` if its size and mtime haven't changed since, else None."""
+
+        path = os.path.abspath(source)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            return cached[2]
+        return None
+
+    def _source_hash(self, source: str) -> Optional[str]:
+        cached = self._indexed_hash(source)
+        if cached is not None:
+            return cached
+        path = os.path.abspath(source)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        digest = hashlib.sha1()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        with self._lock:
+            self._hashes[path] = [stat.st_size, stat.st_mtime, digest.hexdigest()]
+            self._save_index()
+        return digest.hexdigest()
+
+    def _load_index(self) -> None:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as handle:
+                self._hashes = json.load(handle)
+        except (OSError, ValueError):
+            self._hashes = {}
+
+    def _save_index(self) -> None:
+        try:
+            with open(self._index_path, "w", encoding="utf-8") as handle:
+                json.dump(self._hashes, handle)
+        except OSError:
+            pass
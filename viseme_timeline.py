@@ -0,0 +1,82 @@
+"""Per-tick viseme frame schedules compiled from loudness envelopes."""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VISEME_FPS = 30.0
+SMOOTHING = 0.35
+
+
+class VisemeTimeline:
+    """Map playback time to a viseme frame index in constant time.
+
+    The envelope is interpolated at every animation tick and smoothed ahead
+    of playback, so the per-tick work is a single list index. Timelines for
+    streamed audio grow through :meth:`sync` as new envelope points arrive.
+    """
+
+    def __init__(self, frame_count: int, fps: float = VISEME_FPS, smoothing: float = SMOOTHING) -> None:
+        self.frame_count = max(frame_count, 1)
+        self.fps = fps
+        self.smoothing = smoothing
+        self.frames: List[int] = []
+        self._smoothed = 0.0
+        self._consumed = 0
+
+    @classmethod
+    def compile(
+        cls,
+        envelope: Sequence[Tuple[float, float]],
+        frame_count: int,
+        fps: float = VISEME_FPS,
+        smoothing: float = SMOOTHING,
+    ) -> "VisemeTimeline":
+        timeline = cls(frame_count, fps, smoothing)
+        timeline.sync(envelope)
+        return timeline
+
+    @classmethod
+    def synthetic(cls, duration: float, frame_count: int, fps: float = VISEME_FPS) -> "VisemeTimeline":
+        """Build a talking-shaped timeline for clips whose audio could not be analyzed."""
+
+        steps = np.arange(0.0, max(duration, 1.0), 0.04)
+        envelope = list(zip(steps.tolist(), (0.5 + 0.5 * np.sin(steps * 8)).tolist()))
+        return cls.compile(envelope, frame_count, fps)
+
+    def sync(self, envelope: Sequence[Tuple[float, float]]) -> None:
+        """Compile ticks up to the last point of ``envelope`` that are not compiled yet."""
+
+        if len(envelope) <= self._consumed:
+            return
+        window = envelope[max(self._consumed - 1, 0):]
+        times = np.fromiter((point[0] for point in window), dtype=np.float64, count=len(window))
+        values = np.fromiter((point[1] for point in window), dtype=np.float64, count=len(window))
+        self._consumed = len(envelope)
+
+        first_tick = len(self.frames)
+        last_tick = int(math.floor(times[-1] * self.fps))
+        if last_tick < first_tick:
+            return
+        targets = np.interp(np.arange(first_tick, last_tick + 1) / self.fps, times, values)
+
+        top = self.frame_count - 1
+        smoothed = self._smoothed
+        frames = self.frames
+        for target in targets.tolist():
+            smoothed += (target - smoothed) * self.smoothing
+            frames.append(min(max(int(round(smoothed * top)), 0), top))
+        self._smoothed = smoothed
+
+    def frame_at(self, elapsed: float) -> Optional[int]:
+        """Return the frame index for ``elapsed`` seconds, or None before any audio."""
+
+        if not self.frames:
+            return None
+        tick = int(elapsed * self.fps + 1e-6)
+        if tick < 0:
+            return self.frames[0]
+        if tick >= len(self.frames):
+            return self.frames[-1]
+        return self.frames[tick]
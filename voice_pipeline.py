@@ -0,0 +1,401 @@
+"""UI-independent voice pipeline: wake word, capture, endpointing and speech-to-text.
+
+Heavy dependencies (Porcupine, speech recognition engines, the Ollama and
+Fish Audio clients) are imported and constructed on first use, and
+:meth:`VoicePipeline.warm_up` prepares all of them in parallel in the
+background so neither the UI nor the headless daemon waits on them to boot.
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from audio_capture import CaptureService
+from barge_in import EchoGate
+from endpointing import Endpointer
+from process_supervisor import GAME, ProcessSupervisor
+from song_queue import SongQueue
+from turn_trace import tracer
+from turn_worker import Turn, TurnWorker
+
+SERVICES = ("porcupine", "speech_to_text", "command_router", "tts_client")
+
+
+class PipelineHost(ABC):
+    """What the pipeline needs from the app that plays BMO's replies.
+
+    ``BMOApp`` implements this on top of Kivy; ``bmo_daemon`` implements it
+    with plain audio playback. ``handle_command`` and ``handle_unrecognized``
+    run on the turn worker thread; ``interrupt`` is always called through
+    ``call_soon``.
+    """
+
+    @abstractmethod
+    def is_busy(self) -> bool:
+        ...
+
+    @abstractmethod
+    def handle_command(self, text: str, turn: Turn) -> None:
+        ...
+
+    @abstractmethod
+    def handle_unrecognized(self, turn: Turn, fatal: bool) -> None:
+        ...
+
+    @abstractmethod
+    def interrupt(self) -> None:
+        ...
+
+    def call_soon(self, callback: Callable, *args) -> None:
+        callback(*args)
+
+
+class StartupTimer:
+    """Collect named startup durations and print them as one breakdown line."""
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = seconds
+
+    def mark(self, stage: str) -> None:
+        """Record the time from launch to now as ``stage``."""
+
+        self.add(stage, time.perf_counter() - self.started)
+
+    def describe(self) -> str:
+        with self._lock:
+            stages = dict(self.stages)
+        return ", ".join(f"{stage} {seconds * 1000:.0f}ms" for stage, seconds in stages.items())
+
+
+class VoicePipeline:
+    """Run wake-word detection and turn each spoken command into text.
+
+    A detection while the host is idle starts a traced turn that records the
+    command, transcribes it and hands the text to ``host.handle_command``. A
+    detection while the host is busy interrupts it (barge-in) when the echo
+    gate agrees the wake word didn't come from BMO's own speaker.
+
+    The pipeline also owns the :class:`SongQueue` that music tool calls
+    drive. Music isn't a busy state: a wake word heard over it (and cleared by
+    the echo gate) pauses the music for the turn, and it resumes when the
+    host starts listening again.
+
+    Programs launched by tool calls go through its :class:`ProcessSupervisor`.
+    While a game runs, wake-word capture and music are paused so the game
+    gets the CPU, and both come back when the last game exits.
+    """
+
+    def __init__(self, host: PipelineHost, startup: Optional[StartupTimer] = None) -> None:
+        self.host = host
+        self.startup = startup or StartupTimer()
+        self.command_enabled = False
+        self.awaiting_command = False
+        self.capture: Optional[CaptureService] = None
+        self.endpointer: Optional[Endpointer] = None
+        self.device_index = int(os.environ.get("PICOVOICE_DEVICE_INDEX", 0))
+        self.turn_worker = TurnWorker()
+        self.route_on_partial = os.environ.get("BMO_STT_ROUTE_PARTIALS", "1") != "0"
+        self.compare_stt = os.environ.get("BMO_STT_COMPARE", "0") == "1"
+        self.barge_in = os.environ.get("BMO_BARGE_IN", "1") != "0"
+        self.echo_gate = EchoGate()
+        self.music = SongQueue()
+        self.music.listeners.append(self._on_music)
+        self.processes = ProcessSupervisor()
+        self.processes.listeners.append(self._on_process)
+        self.pause_for_games = os.environ.get("BMO_PAUSE_FOR_GAMES", "1") != "0"
+        self.game_running = False
+        self._comparison_stt = None
+        self._services: Dict[str, Future] = {}
+        self._services_lock = threading.Lock()
+        self._warm_up_started = False
+
+    @property
+    def porcupine(self):
+        return self._service("porcupine")
+
+    @property
+    def speech_to_text(self):
+        return self._service("speech_to_text")
+
+    @property
+    def command_router(self):
+        return self._service("command_router")
+
+    @property
+    def tts_client(self):
+        return self._service("tts_client")
+
+    def _service(self, name: str):
+        """Return the named service, constructing it on the calling thread the first time."""
+        with self._services_lock:
+            future = self._services.get(name)
+            owner = future is None
+            if owner:
+                future = self._services[name] = Future()
+        if owner:
+            started = time.perf_counter()
+            try:
+                future.set_result(getattr(self, f"_create_{name}")())
+            except BaseException as exc:
+                future.set_exception(exc)
+            self.startup.add(f"{name} init", time.perf_counter() - started)
+        return future.result()
+
+    @staticmethod
+    def _create_porcupine():
+        import pvporcupine
+
+        access_key = os.environ.get("PICOVOICE_ACCESS_KEY")
+        keyword_path = os.environ.get("PICOVOICE_KEYWORD_PATH")
+        keywords = None if keyword_path else ["bumblebee"]
+        return pvporcupine.create(
+            access_key=access_key,
+            keyword_paths=[keyword_path] if keyword_path else None,
+            keywords=keywords,
+        )
+
+    @staticmethod
+    def _create_speech_to_text():
+        from speech_to_text import create_speech_to_text
+
+        return create_speech_to_text()
+
+    def _create_command_router(self):
+        from command_router import CommandRouter
+
+        return CommandRouter(music=self.music, processes=self.processes)
+
+    @staticmethod
+    def _create_tts_client():
+        from fish_audio import FishAudioClient
+
+        return FishAudioClient()
+
+    def warm_up(self, on_ready: Optional[Callable[[], None]] = None) -> None:
+        """Build and warm every service in parallel on background threads.
+
+        Porcupine, the STT model, the Ollama model and the Fish Audio
+        connection are independent, so boot takes as long as the slowest of
+        them rather than their sum. A startup breakdown is printed once all
+        of them are done.
+        """
+        if self._warm_up_started:
+            return
+        self._warm_up_started = True
+        executor = ThreadPoolExecutor(max_workers=len(SERVICES), thread_name_prefix="bmo-warm-up")
+        futures = [executor.submit(self._warm_service, name) for name in SERVICES]
+        executor.shutdown(wait=False)
+
+        def _report():
+            for future in futures:
+                future.exception()
+            self.startup.mark("ready")
+            print(f"Startup: {self.startup.describe()}")
+            if on_ready:
+                on_ready()
+
+        threading.Thread(target=_report, daemon=True).start()
+
+    def _warm_service(self, name: str) -> None:
+        started = time.perf_counter()
+        try:
+            service = self._service(name)
+            warm_up = getattr(service, "warm_up", None)
+            if warm_up is None:
+                return
+            timings = warm_up()
+        except Exception as exc:  # pragma: no cover - runtime guard
+            print(f"{name} warm-up failed: {exc}")
+            return
+        finally:
+            self.startup.add(name, time.perf_counter() - started)
+        if timings:
+            print(f"{name} warm-up: " + ", ".join(f"{key}={value:.0f}" for key, value in timings.items()))
+
+    def start_listening(self) -> None:
+        if not self.command_enabled or self.game_running:
+            return
+        if self.capture is None:
+            porcupine = self.porcupine
+            self.capture = CaptureService(self.device_index, porcupine.frame_length, porcupine.sample_rate)
+            self.endpointer = Endpointer(porcupine.frame_length, porcupine.sample_rate)
+        self.capture.start(self._on_capture_frame)
+        self.music.resume()
+
+    def stop_listening(self) -> None:
+        if self.capture is not None:
+            self.capture.stop()
+
+    def shutdown(self) -> None:
+        self.music.close()
+        self.processes.shutdown()
+        self.stop_listening()
+        self.turn_worker.shutdown()
+        with self._services_lock:
+            tts = self._services.get("tts_client")
+        if tts is not None and tts.done() and tts.exception() is None:
+            tts.result().shutdown()
+
+    def cancel_current_turn(self) -> None:
+        self.turn_worker.cancel_current()
+        self.awaiting_command = False
+
+    def _on_capture_frame(self, pcm):
+        """Runs on the capture thread for every microphone frame."""
+        if self.capture.recording:
+            return  # the frame belongs to a command being recorded
+        if self.echo_gate.active:
+            self.echo_gate.observe(pcm, self.endpointer.noise_floor)
+        else:
+            self.endpointer.observe(pcm)
+        detect_started = time.time()
+        if self.porcupine.process(pcm) < 0:
+            return
+        if self.host.is_busy():
+            if self.barge_in and self.command_enabled and self.echo_gate.allows(self.endpointer.noise_floor):
+                self.capture.begin_utterance()  # keep the command even before playback has stopped
+                self.host.call_soon(self._barge_in, detect_started)
+            return
+        if self.music.playing and not self.music.paused and not self.echo_gate.allows(self.endpointer.noise_floor):
+            return  # most likely the song, not someone saying the wake word
+        if not self.awaiting_command:
+            self.music.pause()
+            self.awaiting_command = True
+            self.capture.begin_utterance()
+            self._start_traced_turn(detect_started)
+
+    def _on_music(self, event, track, envelope, started):
+        """Let the echo gate follow the music so songs can't trigger the wake word."""
+        if event in ("start", "resume"):
+            self.echo_gate.start_music(envelope, started)
+        elif event in ("pause", "finish"):
+            self.echo_gate.stop_music()
+
+    def _on_process(self, event, process):
+        """Free the CPU for a game: no wake-word processing or music until it exits."""
+        if process.kind != GAME or not self.pause_for_games:
+            return
+        if event == "start":
+            print(f"{process.name} started; pausing wake word and music")
+            self.game_running = True
+            self.music.pause()
+            self.stop_listening()
+        elif event == "exit" and not process.replaced and not self.processes.running(GAME):
+            self.game_running = False
+            self.start_listening()
+
+    def _barge_in(self, detect_started):
+        """Stop whatever BMO is saying or playing and listen for the new command."""
+        print("Wake word heard during playback; interrupting.")
+        self.host.interrupt()
+        self.awaiting_command = True
+        self._start_traced_turn(detect_started, barge_in=True)
+
+    def _start_traced_turn(self, detect_started, **attrs):
+        tracer.begin(detect_started)
+        tracer.record("wake", detect_started, **attrs)
+        self.turn_worker.start_turn(tracer.wrap(self.listen_for_command))
+
+    def listen_for_command(self, turn):
+        """Capture and transcribe one command; runs on the turn worker thread."""
+        import speech_recognition as sr
+
+        if self.host.is_busy() or not self.command_enabled:
+            self.awaiting_command = False
+            self.music.resume()
+            tracer.finish("ignored")
+            return
+
+        self.awaiting_command = True
+        try:
+            speech_text = self._transcribe_command(turn)
+            turn.check()
+            self.host.handle_command(speech_text, turn)
+        except sr.UnknownValueError:
+            self.host.handle_unrecognized(turn, fatal=False)
+        except sr.RequestError:
+            self.host.handle_unrecognized(turn, fatal=True)
+        finally:
+            self.awaiting_command = False
+
+    def _transcribe_command(self, turn):
+        """Record the command while streaming it to the STT engine and return the transcript.
+
+        With a streaming engine, recording stops early once a partial has
+        been stable long enough and already matches a canned reply.
+        """
+        import speech_recognition as sr
+        from speech_to_text import PartialStabilizer
+
+        speech_to_text = self.speech_to_text
+        session = speech_to_text.start()
+        stabilizer = PartialStabilizer()
+        early = []
+
+        def _on_frame(frame):
+            partial = session.accept(frame)
+            if not self.route_on_partial or not speech_to_text.streaming:
+                return
+            stable = stabilizer.update(partial)
+            if stable and self.command_router.can_answer_early(stable):
+                early.append(stable)
+
+        with tracer.span("capture"):
+            pcm = self.capture.record_utterance(
+                self.endpointer,
+                should_abort=lambda: turn.cancelled or bool(early),
+                on_frame=_on_frame,
+            )
+        turn.check()
+        print(
+            f"Endpoint: {self.endpointer.speech_ms / 1000:.1f}s of speech, "
+            f"{self.endpointer.silence_ms}ms tail, noise floor {self.endpointer.noise_floor:.0f}"
+        )
+        if early:
+            print(f"STT ({speech_to_text.name}): routing on stable partial {early[0]!r}")
+            tracer.mark("stt", engine=speech_to_text.name, early=True)
+            return early[0]
+        if not pcm:
+            raise sr.UnknownValueError()
+
+        started = time.perf_counter()
+        with tracer.span("stt", engine=speech_to_text.name):
+            speech_text = session.finish()
+        latency = time.perf_counter() - started
+        speech_to_text.record_latency(latency)
+        stats = speech_to_text.latency_stats()
+        print(
+            f"STT ({speech_to_text.name}): {speech_text!r} in {latency * 1000:.0f}ms "
+            f"(p50 {stats['p50_ms']:.0f}ms over {stats['count']} turns)"
+        )
+        if self.compare_stt and speech_to_text.name != "google":
+            threading.Thread(target=self._compare_with_google, args=(pcm, speech_text, latency), daemon=True).start()
+        return speech_text
+
+    def _compare_with_google(self, pcm, local_text, local_latency):
+        """Transcribe the same audio with Google to log its latency next to the local engine's."""
+        import speech_recognition as sr
+        from speech_to_text import GoogleSpeechToText
+
+        if self._comparison_stt is None:
+            self._comparison_stt = GoogleSpeechToText(self.capture.sample_rate)
+        started = time.perf_counter()
+        try:
+            google_text = self._comparison_stt.transcribe(pcm)
+        except (sr.UnknownValueError, sr.RequestError) as exc:
+            google_text = f"<{type(exc).__name__}>"
+        google_latency = time.perf_counter() - started
+        self._comparison_stt.record_latency(google_latency)
+        print(
+            f"STT comparison: {self.speech_to_text.name} {local_latency * 1000:.0f}ms {local_text!r} vs "
+            f"google {google_latency * 1000:.0f}ms {google_text!r}"
+        )